@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark du dashboard : latence des callbacks pour 20, 500 et 5000 équipes
+
+Pour chaque taille de jeu de données :
+    - callbacks des panneaux (métriques + 5 graphiques, dont les probabilités de fin de saison)
+      et page du tableau trié,
+      à froid (nouvelle version des données, caches de rendu vides) et à chaud ;
+    - aller-retour HTTP complet sur /_dash-update-component (sérialisation JSON comprise) ;
+    - avec un mongod (BENCH_MONGO_URI), requête MongoDB du snapshot ($facet + $lookup).
+
+Utilisation:
+    python benchmarks/bench_dashboard.py [--repeat 20]
+"""
+import argparse
+import itertools
+import time
+
+import mongo_standin
+from fixtures import TEAMS
+
+BACKEND = mongo_standin.install()
+
+import app as dashboard  # noqa: E402
+
+SIZES = (20, 500, 5000)
+PANEL_CALLBACKS = {
+    'metrics': dashboard.update_metrics,
+    'classement': dashboard.update_classement,
+    'buteurs': dashboard.update_buteurs,
+    'diff': dashboard.update_diff,
+    'forme': dashboard.update_forme,
+    'probas': dashboard.update_probas,
+}
+TABLE_SORT = [{'column_id': 'buts_pour', 'direction': 'desc'}]
+
+_versions = itertools.count()
+
+
+def snapshot(n_rows):
+    """Données du dashboard pour n équipes, sous une nouvelle version (caches froids)"""
+    teams = []
+    for position in range(1, n_rows + 1):
+        victoires, nuls = (position * 7) % 20, (position * 3) % 8
+        buts_pour, buts_contre = 10 + (position * 13) % 50, 10 + (position * 11) % 45
+        teams.append({
+            'position': position, 'equipe': f'{TEAMS[position % len(TEAMS)]} {position}',
+            'points': 3 * victoires + nuls, 'matchs_joues': 30, 'victoires': victoires, 'nuls': nuls,
+            'defaites': 30 - victoires - nuls, 'buts_pour': buts_pour, 'buts_contre': buts_contre,
+            'difference': buts_pour - buts_contre, 'forme': '',
+        })
+    # Simulation de fin de saison : une ligne par équipe, comme dans <ligue>_simulations
+    simulation = {'teams': [
+        {'equipe': team['equipe'], 'points': team['points'],
+         **{zone: ((team['position'] * (i + 3)) % 100) / 100 for i, zone in enumerate(dashboard.SIMULATION_ZONES)}}
+        for team in teams
+    ]}
+    return {
+        'teams': teams,
+        'top_scorers': sorted(teams, key=lambda t: -t['buts_pour'])[:10],
+        'simulation': simulation,
+        'stats': {'saison': '2025-2026', 'journee': 30, 'total_equipes': n_rows},
+        'total_teams': n_rows,
+        'total_goals': sum(t['buts_pour'] for t in teams),
+        'version': f'bench-{next(_versions)}',
+    }
+
+
+def refresh(version):
+    """Un rafraîchissement complet côté serveur : tous les panneaux et la première page du tableau"""
+    for callback in PANEL_CALLBACKS.values():
+        callback(version, None)
+    dashboard.update_table(version, 0, dashboard.TABLE_PAGE_SIZE, TABLE_SORT)
+
+
+def http_body(version):
+    """Requête Dash du panneau classement (le plus lourd des graphiques)"""
+    return {
+        'output': '..classement-graph.figure...classement-graph-key.data..',
+        'outputs': [{'id': 'classement-graph', 'property': 'figure'},
+                    {'id': 'classement-graph-key', 'property': 'data'}],
+        'inputs': [{'id': 'data-version', 'property': 'data', 'value': version}],
+        'state': [{'id': 'classement-graph-key', 'property': 'data', 'value': None}],
+        'changedPropIds': ['data-version.data'],
+    }
+
+
+def median_ms(timings):
+    timings = sorted(timings)
+    return timings[len(timings) // 2] * 1000
+
+
+class Dataset:
+    """Jeu de données servi par get_snapshot, renouvelé pour les mesures à froid"""
+
+    def __init__(self, n_rows):
+        self.n_rows = n_rows
+        self.current = snapshot(n_rows)
+
+    def renew(self):
+        self.current = snapshot(self.n_rows)
+
+
+def measure(func, dataset, repeat, cold):
+    timings = []
+    for _ in range(repeat):
+        if cold:
+            dataset.renew()
+        start = time.perf_counter()
+        func(dataset.current['version'])
+        timings.append(time.perf_counter() - start)
+    return median_ms(timings)
+
+
+def run(repeat=20):
+    """Retourne {taille: {scénario: médiane en ms}}"""
+    client = dashboard.server.test_client()
+    results = {}
+    for n_rows in SIZES:
+        dataset = Dataset(n_rows)
+        dashboard.get_snapshot = lambda: dataset.current
+        refresh(dataset.current['version'])        # Remplit les caches pour les mesures à chaud
+
+        result = {}
+        for name, callback in PANEL_CALLBACKS.items():
+            result[f'{name}_cold_ms'] = measure(lambda v, cb=callback: cb(v, None), dataset, repeat, cold=True)
+        result['table_cold_ms'] = measure(
+            lambda v: dashboard.update_table(v, 0, dashboard.TABLE_PAGE_SIZE, TABLE_SORT), dataset, repeat, cold=True)
+        result['refresh_cold_ms'] = measure(refresh, dataset, repeat, cold=True)
+        result['refresh_warm_ms'] = measure(refresh, dataset, repeat, cold=False)
+        result['http_classement_cold_ms'] = measure(
+            lambda v: client.post('/_dash-update-component', json=http_body(v)), dataset, repeat, cold=True)
+        if BACKEND == 'mongod':
+            # mongomock ne gère pas le $lookup avec pipeline du snapshot
+            teams = dashboard.mongo_client.db.ligue1_teams
+            teams.delete_many({})
+            teams.insert_many([dict(team) for team in dataset.current['teams']])
+            result['mongo_snapshot_ms'] = measure(
+                lambda v: dashboard.mongo_client._fetch_dashboard_snapshot(20, 10), dataset, repeat, cold=False)
+        results[str(n_rows)] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark des callbacks du dashboard')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    scenarios = list(next(iter(results.values())))
+    print(f'MongoDB: {BACKEND}')
+    print(f"{'scénario':<26}" + ''.join(f'{size + " lignes":>14}' for size in results))
+    for scenario in scenarios:
+        print(f'{scenario:<26}' + ''.join(f'{results[size][scenario]:>12.2f}ms' for size in results))
+
+
+if __name__ == '__main__':
+    main()
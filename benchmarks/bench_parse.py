@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark du spider : temps de parsing complet d'une page (Ligue1Spider.parse)
+
+Mesure le parsing lxml, la localisation du tableau et la conversion des lignes en items.
+
+Utilisation:
+    python benchmarks/bench_parse.py [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scraper'))
+
+from scrapy.http import HtmlResponse  # noqa: E402
+
+from ligue1_scraper.spiders.ligue1_spider import Ligue1Spider  # noqa: E402
+from fixtures import all_pages  # noqa: E402
+
+URL = 'https://fr.wikipedia.org/wiki/Championnat_de_France_de_football_2025-2026'
+
+
+def run(repeat=20):
+    """Retourne {page: {'parse_ms': médiane, 'items': nombre d'items}}"""
+    results = {}
+    for name, html in all_pages().items():
+        body = html.encode('utf-8')
+        spider = Ligue1Spider()
+        spider.fingerprints = {}
+        timings = []
+        items = 0
+        for _ in range(repeat):
+            response = HtmlResponse(url=URL, body=body, encoding='utf-8')
+            start = time.perf_counter()
+            items = len(list(spider.parse(response, ligue='ligue1', saison='2025-2026')))
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results[name] = {
+            'parse_ms': timings[len(timings) // 2] * 1000,
+            'page_kb': len(body) / 1024,
+            'items': items,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du parsing des pages')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'page':<25}{'taille':>10}{'items':>8}{'parse':>12}")
+    for name, result in run(args.repeat).items():
+        print(f"{name:<25}{result['page_kb']:>8.0f}kB{result['items']:>8}{result['parse_ms']:>10.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
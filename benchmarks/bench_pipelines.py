@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark des pipelines : items/s à travers DataCleaningPipeline puis MongoDBPipeline
+
+MongoDB : mongod local si BENCH_MONGO_URI est défini, sinon mongomock (voir mongo_standin).
+Le pipeline asynchrone (Motor) n'est mesuré qu'avec un mongod.
+
+Utilisation:
+    python benchmarks/bench_pipelines.py [--repeat 5]
+"""
+import argparse
+import asyncio
+import time
+
+import mongo_standin
+from fixtures import ranking_rows
+
+BACKEND = mongo_standin.install()
+
+from scrapy.utils.test import get_crawler  # noqa: E402
+
+from ligue1_scraper.items import Ligue1StatsItem, Ligue1TeamItem  # noqa: E402
+from ligue1_scraper.pipelines import AsyncMongoDBPipeline, DataCleaningPipeline, MongoDBPipeline  # noqa: E402
+from ligue1_scraper.spiders.ligue1_spider import Ligue1Spider  # noqa: E402
+
+CURRENT_SEASON = Ligue1Spider.saison
+
+
+def season_items(saison, n_teams=18, seed=0):
+    """Items d'une page de classement (équipes + stats), tels que produits par le spider"""
+    rows = ranking_rows(n_teams, seed)
+    items = [Ligue1TeamItem(ligue='ligue1', saison=saison, forme='', **row) for row in rows]
+    items.append(Ligue1StatsItem(ligue='ligue1', saison=saison, journee=rows[0]['matchs_joues'],
+                                 total_equipes=len(rows), total_matchs=0))
+    return items
+
+
+def scenarios():
+    """{nom: (items à rejouer, la base est-elle vidée avant chaque exécution)}"""
+    backfill = []
+    for year in range(1995, 2025):
+        backfill += season_items(f'{year}-{year + 1}', n_teams=20, seed=year)
+    return {
+        'live_first_crawl': (lambda: season_items(CURRENT_SEASON), True),
+        'live_unchanged': (lambda: season_items(CURRENT_SEASON), False),
+        'backfill_30_seasons': (lambda: [item.copy() for item in backfill], True),
+    }
+
+
+def make_spider(settings):
+    crawler = get_crawler(Ligue1Spider, settings)
+    return Ligue1Spider.from_crawler(crawler, ligues='ligue1')
+
+
+def run_sync(items, spider):
+    cleaning = DataCleaningPipeline()
+    mongo = MongoDBPipeline.from_crawler(spider.crawler)
+    mongo.open_spider(spider)
+    start = time.perf_counter()
+    for item in items:
+        mongo.process_item(cleaning.process_item(item, spider), spider)
+    mongo.close_spider(spider)
+    return time.perf_counter() - start
+
+
+def run_async(items, spider):
+    async def crawl():
+        cleaning = DataCleaningPipeline()
+        mongo = AsyncMongoDBPipeline.from_crawler(spider.crawler)
+        await mongo._open_spider(spider)
+        start = time.perf_counter()
+        for item in items:
+            await mongo.process_item(cleaning.process_item(item, spider), spider)
+        await mongo._close_spider(spider)
+        return time.perf_counter() - start
+    return asyncio.run(crawl())
+
+
+def run(repeat=5):
+    """Retourne {pipeline/scénario: {'items': n, 'items_per_s': médiane, 'duration_ms': médiane}}"""
+    settings = {
+        'MONGO_URI': mongo_standin.mongo_uri(),
+        'MONGO_DATABASE': mongo_standin.BENCH_DB,
+        'LOG_LEVEL': 'WARNING',
+    }
+    runners = {'sync': run_sync}
+    if BACKEND == 'mongod':
+        runners['async'] = run_async
+
+    results = {}
+    for runner_name, runner in runners.items():
+        for name, (make_items, reset) in scenarios().items():
+            mongo_standin.reset_database()
+            if not reset:
+                # Premier passage non mesuré : les équipes sont déjà en base
+                runner(make_items(), make_spider(settings))
+            timings = []
+            for _ in range(repeat):
+                if reset:
+                    mongo_standin.reset_database()
+                items = make_items()
+                timings.append(runner(items, make_spider(settings)))
+            timings.sort()
+            median = timings[len(timings) // 2]
+            results[f'{runner_name}/{name}'] = {
+                'items': len(items),
+                'items_per_s': len(items) / median,
+                'duration_ms': median * 1000,
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark des pipelines')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'MongoDB: {BACKEND}')
+    print(f"{'scénario':<32}{'items':>8}{'durée':>12}{'items/s':>12}")
+    for name, result in run(args.repeat).items():
+        print(f"{name:<32}{result['items']:>8}{result['duration_ms']:>10.1f}ms{result['items_per_s']:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la simulation de fin de saison : 100 000 saisons simulées (Ligue 1 à 18 équipes)
+
+Mesure un processus seul (simulations/s) et le pool de processus complet (lancement compris).
+
+Utilisation:
+    python benchmarks/bench_simulation.py [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from ligue1_common.simulation import SeasonState, run_simulations, simulate_positions  # noqa: E402
+from ligue1_common.standings import SeasonMatches, standings_at  # noqa: E402
+from fixtures import season_matches  # noqa: E402
+
+N_SIMULATIONS = 100_000
+
+
+def season_state(journees):
+    """Classement et matchs restants après ``journees`` journées"""
+    docs = season_matches(n_teams=18, journees=journees)
+    teams = standings_at(SeasonMatches.from_documents(docs)).table()
+    return SeasonState.from_documents(teams, docs)
+
+
+def median_s(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def run(repeat=3):
+    """Retourne {journée: {'fixtures': n, 'sims_per_s': un processus, 'pool_100k_ms': pool complet}}"""
+    results = {}
+    for journees in (1, 17, 30):
+        state = season_state(journees)
+        single = median_s(lambda: simulate_positions(state, N_SIMULATIONS // 10, seed=0), repeat)
+        results[f'journee_{journees}'] = {
+            'fixtures': state.n_fixtures,
+            'sims_per_s': N_SIMULATIONS // 10 / single,
+            'pool_100k_ms': median_s(lambda: run_simulations(state, N_SIMULATIONS, seed=0), repeat) * 1000,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la simulation de fin de saison')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{os.cpu_count()} CPU')
+    print(f"{'scénario':<16}{'matchs':>8}{'simul./s':>12}{'100k (pool)':>14}")
+    for name, result in run(args.repeat).items():
+        print(f"{name:<16}{result['fixtures']:>8}{result['sims_per_s']:>12.0f}{result['pool_100k_ms']:>12.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark du spider : localisation du tableau de classement
+
+Compare l'ancien localisateur (concaténation de tout le texte de chaque tableau)
+au localisateur par en-têtes, avec et sans empreinte mémorisée.
+
+Utilisation:
+    python benchmarks/bench_spider.py [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scraper'))
+
+from scrapy.http import HtmlResponse  # noqa: E402
+
+from ligue1_scraper.spiders.ligue1_spider import Ligue1Spider  # noqa: E402
+from fixtures import all_pages  # noqa: E402
+
+URL = 'https://fr.wikipedia.org/wiki/Championnat_de_France_de_football_2025-2026'
+
+
+def legacy_find_ranking_table(response):
+    """Localisateur historique, conservé comme référence"""
+    for selector in ['table.wikitable', 'table']:
+        tables = response.css(selector)
+        if not tables:
+            continue
+        for table in tables:
+            text = ' '.join(table.css('::text').getall())
+            if 'Pts' in text and any(team in text for team in ['Paris Saint-Germain', 'Lens', 'Monaco']):
+                return table
+    return None
+
+
+def make_response(html):
+    # Nouvelle réponse à chaque itération : aucun résultat XPath réutilisé
+    return HtmlResponse(url=URL, body=html.encode('utf-8'), encoding='utf-8')
+
+
+def timeit(func, html, repeat):
+    timings = []
+    for _ in range(repeat):
+        response = make_response(html)
+        response.selector  # Parsing lxml exclu de la mesure
+        start = time.perf_counter()
+        func(response)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def run(repeat=20):
+    """Retourne {page: {scénario: médiane en ms}}"""
+    results = {}
+    for name, html in all_pages().items():
+        cold = Ligue1Spider()
+        cold.fingerprints = {}
+
+        def locate_cold(response, spider=cold):
+            spider.fingerprints = {}
+            return spider._find_ranking_table(response)
+
+        warm = Ligue1Spider()
+        warm.fingerprints = {}
+        warm._find_ranking_table(make_response(html))
+
+        results[name] = {
+            'legacy_ms': timeit(legacy_find_ranking_table, html, repeat),
+            'headers_ms': timeit(locate_cold, html, repeat),
+            'fingerprint_ms': timeit(warm._find_ranking_table, html, repeat),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du localisateur de tableau')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'page':<25}{'legacy':>12}{'headers':>12}{'fingerprint':>14}")
+    for name, timings in run(args.repeat).items():
+        print(f"{name:<25}{timings['legacy_ms']:>10.2f}ms{timings['headers_ms']:>10.2f}ms"
+              f"{timings['fingerprint_ms']:>12.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
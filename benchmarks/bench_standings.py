@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark du moteur de classement : toutes les journées de 30 saisons recalculées depuis les résultats
+
+Utilisation:
+    python benchmarks/bench_standings.py [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+from ligue1_common.standings import SeasonMatches, standings_at, standings_by_journee  # noqa: E402
+from fixtures import season_matches  # noqa: E402
+
+N_SEASONS = 30
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def run(repeat=20):
+    """Retourne {scénario: {'duration_ms': médiane, ...}}"""
+    docs = [season_matches(n_teams=20, seed=seed) for seed in range(N_SEASONS)]
+    seasons = [SeasonMatches.from_documents(season) for season in docs]
+    return {
+        'from_documents_30_seasons': {
+            'duration_ms': median_ms(lambda: [SeasonMatches.from_documents(season) for season in docs], repeat),
+        },
+        'all_journees_30_seasons': {
+            'tables': sum(season.n_journees for season in seasons),
+            'duration_ms': median_ms(lambda: [standings_by_journee(season) for season in seasons], repeat),
+        },
+        'single_table': {
+            'duration_ms': median_ms(lambda: standings_at(seasons[0], journee=20).table(), repeat),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du moteur de classement')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'scénario':<32}{'durée':>12}")
+    for name, result in run(args.repeat).items():
+        print(f"{name:<32}{result['duration_ms']:>10.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
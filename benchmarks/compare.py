@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Compare deux fichiers de résultats produits par run.py
+
+Les durées (clés en *_ms) sont meilleures quand elles baissent, les débits (*_per_s)
+quand ils augmentent. Le code de sortie vaut 1 si une mesure régresse au-delà du seuil.
+
+Utilisation:
+    python benchmarks/compare.py results/abc1234.json results/def5678.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+
+
+def flatten(results, prefix=''):
+    """{'parse': {'page': {'parse_ms': 1.2}}} -> {'parse/page/parse_ms': 1.2}"""
+    flat = {}
+    for key, value in results.items():
+        path = f'{prefix}/{key}' if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and (key.endswith('_ms') or key.endswith('_per_s')):
+            flat[path] = value
+    return flat
+
+
+def change_percent(path, before, after):
+    """Évolution en %, positive quand la mesure s'améliore"""
+    if not before:
+        return 0.0
+    change = (after - before) / before * 100
+    return change if path.endswith('_per_s') else -change
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Comparaison de deux exécutions des benchmarks')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Régression tolérée en %% (défaut : 10)')
+    args = parser.parse_args()
+
+    with open(args.before, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(args.after, encoding='utf-8') as f:
+        after = json.load(f)
+
+    old, new = flatten(before['results']), flatten(after['results'])
+    print(f"{before['commit']} -> {after['commit']}")
+    print(f"{'mesure':<60}{'avant':>12}{'après':>12}{'gain':>9}")
+
+    regressions = 0
+    for path in sorted(set(old) & set(new)):
+        change = change_percent(path, old[path], new[path])
+        flag = ''
+        if change < -args.threshold:
+            flag = '  ⚠️ régression'
+            regressions += 1
+        print(f'{path:<60}{old[path]:>12.2f}{new[path]:>12.2f}{change:>8.1f}%{flag}')
+
+    for path in sorted(set(old) ^ set(new)):
+        print(f"{path:<60}{'(absent dans ' + ('après' if path in old else 'avant') + ')':>33}")
+
+    if regressions:
+        print(f'❌ {regressions} régression(s) au-delà de {args.threshold:.0f}%')
+        sys.exit(1)
+    print('✅ Aucune régression')
+
+
+if __name__ == '__main__':
+    main()
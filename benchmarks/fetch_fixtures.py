@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Enregistre des pages Wikipedia réelles dans benchmarks/fixtures/ (utilisées en priorité par les benchmarks)
+
+Les pages téléchargées sont à versionner : les comparaisons entre commits portent
+alors toujours sur le même HTML, même si l'article Wikipedia évolue.
+
+Utilisation:
+    python benchmarks/fetch_fixtures.py [--force]
+"""
+import argparse
+import os
+import sys
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scraper'))
+
+from ligue1_scraper.spiders.ligue1_spider import COMPETITIONS  # noqa: E402
+from fixtures import FIXTURES_DIR  # noqa: E402
+
+# Saison en cours, saisons historiques (autres en-têtes, 20 équipes) et page volumineuse
+PAGES = {
+    'ligue1_2025-2026': ('ligue1', '2025-2026'),
+    'ligue1_2005-2006': ('ligue1', '2005-2006'),
+    'ligue1_1995-1996': ('ligue1', '1995-1996'),
+    'premier_league_2023-2024': ('premier_league', '2023-2024'),
+}
+USER_AGENT = 'Ligue1Analytics-benchmarks (+https://github.com/Sachachen/DataEngineering)'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Téléchargement des pages de benchmark')
+    parser.add_argument('--force', action='store_true', help='Retélécharger les pages déjà présentes')
+    args = parser.parse_args()
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, (ligue, saison) in PAGES.items():
+        path = os.path.join(FIXTURES_DIR, f'{name}.html')
+        if os.path.exists(path) and not args.force:
+            print(f'= {name} (déjà présente)')
+            continue
+        url = COMPETITIONS[ligue]['url'].format(saison=saison)
+        request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                html = response.read().decode('utf-8')
+        except OSError as e:
+            print(f'✗ {name}: {e}')
+            continue
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(html)
+        print(f'✓ {name} ({len(html) // 1024} kB)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Pages de test pour les benchmarks
+
+Les pages Wikipedia enregistrées dans benchmarks/fixtures/*.html sont utilisées en priorité.
+Des pages synthétiques reproduisant la structure d'une page de saison (infobox, nombreux
+tableaux annexes, classement, grille de résultats) complètent le jeu de données.
+"""
+import glob
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+TEAMS = [
+    'Paris Saint-Germain', 'Olympique de Marseille', 'AS Monaco', 'LOSC Lille', 'OGC Nice',
+    'Olympique lyonnais', 'RC Lens', 'Stade rennais', 'RC Strasbourg', 'Stade brestois',
+    'Toulouse FC', 'FC Nantes', 'AJ Auxerre', 'Angers SCO', 'Le Havre AC', 'FC Lorient',
+    'Paris FC', 'FC Metz', 'Montpellier HSC', 'AS Saint-Étienne',
+]
+
+
+def saved_pages():
+    """Pages Wikipedia enregistrées : {nom: html}"""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            pages[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return pages
+
+
+def ranking_rows(n_teams=18, seed=0):
+    """Lignes de classement cohérentes (V+N+D = J, Pts = 3V+N, Diff = BP-BC)"""
+    rng = random.Random(seed)
+    rows = []
+    for equipe in TEAMS[:n_teams]:
+        joues = 20
+        victoires = rng.randint(2, 15)
+        nuls = rng.randint(0, joues - victoires)
+        defaites = joues - victoires - nuls
+        buts_pour = rng.randint(10, 50)
+        buts_contre = rng.randint(10, 45)
+        rows.append({
+            'equipe': equipe, 'points': 3 * victoires + nuls, 'matchs_joues': joues,
+            'victoires': victoires, 'nuls': nuls, 'defaites': defaites,
+            'buts_pour': buts_pour, 'buts_contre': buts_contre,
+            'difference': buts_pour - buts_contre,
+        })
+    rows.sort(key=lambda r: (-r['points'], -r['difference'], -r['buts_pour']))
+    for position, row in enumerate(rows, start=1):
+        row['position'] = position
+    return rows
+
+
+def _ranking_table(rows):
+    header = ''.join(f'<th scope="col">{label}</th>' for label in
+                     ('Rang', 'Équipe', '<abbr title="Points">Pts</abbr>', 'J', 'G', 'N', 'P',
+                      'Bp', 'Bc', 'Diff'))
+    body = []
+    for r in rows:
+        diff = f"+{r['difference']}" if r['difference'] > 0 else str(r['difference']).replace('-', '−')
+        body.append(
+            f"<tr><td>{r['position']}</td>"
+            f"<td style=\"text-align:left\"><span class=\"flagicon\"><img src=\"x.png\"/></span> "
+            f"<a href=\"/wiki/{r['equipe']}\">{r['equipe']}</a></td>"
+            f"<td><b>{r['points']}</b></td><td>{r['matchs_joues']}</td><td>{r['victoires']}</td>"
+            f"<td>{r['nuls']}</td><td>{r['defaites']}</td><td>{r['buts_pour']}</td>"
+            f"<td>{r['buts_contre']}</td><td>{diff}</td></tr>"
+        )
+    return f'<table class="wikitable sortable"><tbody><tr>{header}</tr>{"".join(body)}</tbody></table>'
+
+
+def _filler_table(rng, n_rows=20, n_cols=8):
+    header = ''.join(f'<th>Colonne {c}</th>' for c in range(n_cols))
+    body = ''.join(
+        '<tr>' + ''.join(f'<td><a href="/wiki/x">{rng.choice(TEAMS)}</a> {rng.randint(0, 99)}</td>'
+                         for _ in range(n_cols)) + '</tr>'
+        for _ in range(n_rows)
+    )
+    return f'<table class="wikitable"><tbody><tr>{header}</tr>{body}</tbody></table>'
+
+
+def _results_grid(rows, rng):
+    teams = [r['equipe'] for r in rows]
+    header = '<th></th>' + ''.join(f'<th><abbr title="{t}">{t[:3].upper()}</abbr></th>' for t in teams)
+    body = ''.join(
+        f'<tr><th>{home}</th>' + ''.join(
+            '<td>—</td>' if home == away else f'<td>{rng.randint(0, 4)}-{rng.randint(0, 4)}</td>'
+            for away in teams) + '</tr>'
+        for home in teams
+    )
+    return f'<table class="wikitable"><tbody><tr>{header}</tr>{body}</tbody></table>'
+
+
+def synthetic_page(n_teams=18, tables_before=12, tables_after=12, seed=0):
+    """Page de saison synthétique avec le classement au milieu de nombreux tableaux"""
+    rng = random.Random(seed)
+    rows = ranking_rows(n_teams, seed)
+    parts = ['<html><head><meta charset="utf-8"></head><body><div id="content">',
+             '<table class="infobox_v2"><tr><th>Saison</th><td>2025-2026</td></tr></table>']
+    parts += [f'<h3>Section {i}</h3>' + _filler_table(rng) for i in range(tables_before)]
+    parts.append('<h2>Classement</h2>' + _ranking_table(rows))
+    parts.append('<h2>Résultats</h2>' + _results_grid(rows, rng))
+    parts += [f'<h3>Annexe {i}</h3>' + _filler_table(rng, n_rows=30) for i in range(tables_after)]
+    parts.append('</div></body></html>')
+    return ''.join(parts)
+
+
+def all_pages():
+    """Pages enregistrées + pages synthétiques (actuelle, historique à 20 équipes, page volumineuse)"""
+    pages = {
+        'synthetic_current': synthetic_page(n_teams=18),
+        'synthetic_historical': synthetic_page(n_teams=20, tables_before=4, tables_after=4, seed=1),
+        'synthetic_large': synthetic_page(n_teams=20, tables_before=40, tables_after=60, seed=2),
+    }
+    pages.update(saved_pages())
+    return pages
+
+
+def season_matches(n_teams=20, seed=0, journees=None):
+    """Documents <ligue>_matches d'une saison aller-retour (méthode du cercle), journées 1..journees"""
+    rng = random.Random(seed)
+    teams = TEAMS[:n_teams]
+    journees = journees or 2 * (n_teams - 1)
+    order = list(range(n_teams))
+    first_leg = []
+    for _ in range(n_teams - 1):
+        first_leg.append([(order[i], order[n_teams - 1 - i]) for i in range(n_teams // 2)])
+        order = [order[0], order[-1]] + order[1:-1]
+    rounds = first_leg + [[(away, home) for home, away in pairs] for pairs in first_leg]
+
+    docs = []
+    for journee, pairs in enumerate(rounds[:journees], start=1):
+        for home, away in pairs:
+            docs.append({
+                'journee': journee, 'journee_estimee': False, 'first_seen': None,
+                'equipe_domicile': teams[home], 'equipe_exterieur': teams[away],
+                'buts_domicile': int(min(rng.expovariate(0.7), 7)),
+                'buts_exterieur': int(min(rng.expovariate(0.9), 7)),
+            })
+    return docs
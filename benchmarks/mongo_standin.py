@@ -0,0 +1,44 @@
+"""
+MongoDB pour les benchmarks
+
+Un mongod local est utilisé si BENCH_MONGO_URI est défini (ex. mongodb://localhost:27017),
+sinon une base mongomock en mémoire remplace le client de ligue1_common.connection.
+"""
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+for path in ('common', 'scraper', 'webapp'):
+    if os.path.join(ROOT, path) not in sys.path:
+        sys.path.insert(0, os.path.join(ROOT, path))
+
+BENCH_DB = 'ligue1_bench'
+
+
+def mongo_uri():
+    return os.getenv('BENCH_MONGO_URI', 'mongodb://localhost:27017')
+
+
+def install():
+    """Prépare le client MongoDB des benchmarks et retourne le nom du backend"""
+    # Le dashboard lit la base de benchmark
+    os.environ['MONGO_URI'] = mongo_uri()
+    os.environ['MONGO_DB'] = BENCH_DB
+    if os.getenv('BENCH_MONGO_URI'):
+        return 'mongod'
+
+    import mongomock
+    from ligue1_common import connection
+
+    # Une seule base en mémoire partagée par tous les clients (spider et dashboard)
+    shared = mongomock.MongoClient()
+    connection.MongoClient = lambda uri, event_listeners=None, **options: shared
+    # mongomock ne sait pas expliquer les requêtes
+    os.environ.setdefault('QUERY_PLAN_CHECK', 'off')
+    return 'mongomock'
+
+
+def reset_database():
+    """Base de benchmark vide"""
+    from ligue1_common.connection import get_client
+    get_client(mongo_uri()).drop_database(BENCH_DB)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Lance toute la suite de benchmarks et enregistre les résultats en JSON
+
+Le fichier benchmarks/results/<commit>.json peut ensuite être comparé à celui d'un
+autre commit avec compare.py.
+
+Utilisation:
+    python benchmarks/run.py [--repeat 20] [--only spider,parse,pipelines,dashboard,standings,simulation] [--output FICHIER]
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Suites : module et nombre de répétitions relatif (les pipelines sont plus lents)
+SUITES = {
+    'spider': ('bench_spider', 1.0),
+    'parse': ('bench_parse', 1.0),
+    'pipelines': ('bench_pipelines', 0.25),
+    'dashboard': ('bench_dashboard', 1.0),
+    'standings': ('bench_standings', 1.0),
+    'simulation': ('bench_simulation', 0.1),
+}
+
+
+def git_commit():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, text=True).strip()
+        dirty = subprocess.check_output(['git', 'status', '--porcelain'], cwd=BENCH_DIR, text=True).strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Suite de benchmarks')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--only', default=','.join(SUITES), help='Suites à lancer, séparées par des virgules')
+    parser.add_argument('--output', help='Fichier de résultats (défaut : benchmarks/results/<commit>.json)')
+    args = parser.parse_args()
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f'{platform.system()} {platform.machine()} ({os.cpu_count()} CPU)',
+        'repeat': args.repeat,
+        'results': {},
+    }
+
+    for name in args.only.split(','):
+        module_name, factor = SUITES[name.strip()]
+        print(f'▶ {name}...')
+        module = importlib.import_module(module_name)
+        report['results'][name] = module.run(max(3, int(args.repeat * factor)))
+        if hasattr(module, 'BACKEND'):
+            report.setdefault('mongo', module.BACKEND)
+
+    output = args.output or os.path.join(RESULTS_DIR, f'{commit}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'✅ Résultats enregistrés : {output}')
+
+
+if __name__ == '__main__':
+    main()
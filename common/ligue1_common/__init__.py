@@ -0,0 +1,5 @@
+"""
+Code partagé entre le spider (scraper/) et le dashboard (webapp/)
+
+Le dossier common/ est copié dans chaque image Docker et ajouté au PYTHONPATH.
+"""
@@ -0,0 +1,182 @@
+"""
+Fabrique de clients MongoDB partagée par le spider et le dashboard
+
+Un seul MongoClient (et donc un seul pool de connexions) par URI et par processus :
+après un fork (workers gunicorn), le processus enfant crée son propre client.
+Les options du pool se règlent par variables d'environnement (voir mongo_options).
+"""
+from pymongo import MongoClient, monitoring
+import asyncio
+import os
+import threading
+import time
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+def mongo_options(**overrides):
+    """Options du MongoClient : pool, compression, préférence de lecture, timeouts et retries"""
+    options = {
+        'maxPoolSize': _env_int('MONGO_MAX_POOL_SIZE', 50),
+        'minPoolSize': _env_int('MONGO_MIN_POOL_SIZE', 0),
+        'maxIdleTimeMS': _env_int('MONGO_MAX_IDLE_TIME_MS', 60000),
+        # Attente maximale d'une connexion libre quand le pool est saturé
+        'waitQueueTimeoutMS': _env_int('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000),
+        'serverSelectionTimeoutMS': _env_int('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+        'connectTimeoutMS': _env_int('MONGO_CONNECT_TIMEOUT_MS', 5000),
+        'socketTimeoutMS': _env_int('MONGO_SOCKET_TIMEOUT_MS', 30000),
+        'readPreference': os.getenv('MONGO_READ_PREFERENCE', 'primary'),
+        'retryReads': _env_bool('MONGO_RETRY_READS', True),
+        'retryWrites': _env_bool('MONGO_RETRY_WRITES', True),
+    }
+    # zlib ne demande aucune dépendance ; zstd/snappy nécessitent zstandard/python-snappy
+    compressors = os.getenv('MONGO_COMPRESSORS', 'zlib')
+    if compressors:
+        options['compressors'] = compressors
+    options.update(overrides)
+    return options
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Statistiques des pools de connexions, alimentées par les événements pymongo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._servers = {}
+
+    def _server(self, address):
+        key = f'{address[0]}:{address[1]}'
+        server = self._servers.get(key)
+        if server is None:
+            server = self._servers[key] = {
+                'open': 0, 'checked_out': 0, 'created': 0, 'closed': 0,
+                'checkouts': 0, 'checkout_failures': 0, 'pool_cleared': 0,
+                'wait_ms_total': 0.0, 'wait_ms_max': 0.0,
+            }
+        return server
+
+    def _update(self, address, **increments):
+        with self._lock:
+            server = self._server(address)
+            for name, value in increments.items():
+                server[name] += value
+            return server
+
+    def reset(self):
+        with self._lock:
+            self._servers = {}
+
+    def snapshot(self):
+        """Copie des statistiques par serveur (host:port)"""
+        with self._lock:
+            return {key: dict(server) for key, server in self._servers.items()}
+
+    # Les événements de checkout sont émis dans le thread qui emprunte la connexion
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait_ms = (time.perf_counter() - getattr(self._local, 'started', time.perf_counter())) * 1000
+        with self._lock:
+            server = self._server(event.address)
+            server['checked_out'] += 1
+            server['checkouts'] += 1
+            server['wait_ms_total'] += wait_ms
+            server['wait_ms_max'] = max(server['wait_ms_max'], wait_ms)
+
+    def connection_check_out_failed(self, event):
+        self._update(event.address, checkout_failures=1)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, checked_out=-1)
+
+    def connection_created(self, event):
+        self._update(event.address, open=1, created=1)
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1, closed=1)
+
+    def pool_cleared(self, event):
+        self._update(event.address, pool_cleared=1)
+
+    def pool_created(self, event):
+        self._update(event.address)
+
+    # Événements sans effet sur les statistiques
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+# Instance unique par processus, partagée par tous les clients
+pool_stats = PoolStats()
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(uri, **options):
+    """MongoClient partagé pour cette URI dans le processus courant (créé au premier appel)"""
+    key = (uri, os.getpid(), tuple(sorted(options.items())))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = create_client(uri, **options)
+        return client
+
+
+def create_client(uri, **options):
+    """Nouveau MongoClient (non partagé) avec les options et les listeners de la plateforme"""
+    return MongoClient(uri, event_listeners=[pool_stats], **mongo_options(**options))
+
+
+def create_async_client(uri, **options):
+    """Client Motor (asyncio) avec les mêmes options, à créer dans la boucle asyncio en cours"""
+    # Motor n'est installé que côté spider
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(uri, event_listeners=[pool_stats], **mongo_options(**options))
+
+
+def get_async_client(uri, **options):
+    """Client Motor partagé par la boucle asyncio en cours (créé au premier appel)
+
+    Un client Motor est lié à sa boucle : le scheduler, qui garde la même boucle toute
+    sa vie, réutilise ainsi un seul pool d'un crawl à l'autre.
+    """
+    loop = asyncio.get_running_loop()
+    key = (uri, os.getpid(), tuple(sorted(options.items())), loop)
+    with _clients_lock:
+        # Clients des boucles fermées : inutilisables
+        for stale in [other for other in _clients if len(other) == 4 and other[3].is_closed()]:
+            _clients.pop(stale).close()
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = create_async_client(uri, **options)
+        return client
+
+
+def close_clients():
+    """Ferme les clients partagés (pymongo et Motor) du processus courant"""
+    with _clients_lock:
+        for key in [key for key in _clients if key[1] == os.getpid()]:
+            _clients.pop(key).close()
+
+
+def reset_after_fork():
+    """Oublie les clients hérités du processus parent (sans les fermer : ils lui appartiennent)"""
+    with _clients_lock:
+        for key in [key for key in _clients if key[1] != os.getpid()]:
+            del _clients[key]
+    pool_stats.reset()
@@ -0,0 +1,185 @@
+"""
+Index MongoDB de la plateforme
+
+Créés de façon idempotente au démarrage du spider (MongoDBPipeline.open_spider)
+et du dashboard (MongoDBClient.connect), quel que soit le service lancé en premier.
+"""
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+import logging
+
+logger = logging.getLogger(__name__)
+
+HISTORY_COLLECTION = 'standings_history'
+# Suppression des doublons par lots d'identifiants
+DELETE_BATCH_SIZE = 1000
+
+# Collection "live" des équipes ({ligue}_teams)
+TEAM_INDEXES = [
+    # Clé de l'upsert du pipeline
+    IndexModel([('equipe', ASCENDING)], unique=True, name='equipe_unique'),
+    # Classement trié (get_teams, dashboard)
+    IndexModel([('position', ASCENDING)], name='position'),
+    # Meilleures attaques : requête couverte (equipe, buts_pour, position sans _id)
+    IndexModel([('buts_pour', DESCENDING), ('equipe', ASCENDING), ('position', ASCENDING)],
+               name='buts_pour_equipe_position'),
+]
+
+# Statistiques globales ({ligue}_stats)
+STATS_INDEXES = [
+    # Clé de l'upsert du pipeline
+    IndexModel([('saison', ASCENDING), ('journee', ASCENDING)], unique=True, name='saison_journee_unique'),
+    # Dernière ligne de stats (get_stats, dashboard)
+    IndexModel([('scraped_date', DESCENDING)], name='scraped_date'),
+]
+
+# Résultats match par match ({ligue}_matches)
+MATCH_INDEXES = [
+    # Clé de l'upsert du pipeline, et chargement des matchs d'une saison par le spider
+    IndexModel([('saison', ASCENDING), ('equipe_domicile', ASCENDING), ('equipe_exterieur', ASCENDING)],
+               unique=True, name='saison_domicile_exterieur_unique'),
+    # Matchs d'une journée
+    IndexModel([('saison', ASCENDING), ('journee', ASCENDING)], name='saison_journee'),
+]
+
+# Simulations de fin de saison ({ligue}_simulations)
+SIMULATION_INDEXES = [
+    # Cache par (saison, journée) du scheduler
+    IndexModel([('saison', ASCENDING), ('journee', ASCENDING)], unique=True, name='saison_journee_unique'),
+    # Dernière simulation (dashboard)
+    IndexModel([('computed_at', DESCENDING)], name='computed_at'),
+]
+
+# Historique du classement
+HISTORY_INDEXES = [
+    # Classement à la journée N : parcours de (ligue, saison, journee)
+    IndexModel([('ligue', ASCENDING), ('saison', ASCENDING), ('journee', ASCENDING), ('equipe', ASCENDING)],
+               unique=True, name='ligue_saison_journee_equipe'),
+    # Trajectoire d'une équipe : parcours de (equipe, ligue, saison) trié par journée
+    IndexModel([('equipe', ASCENDING), ('ligue', ASCENDING), ('saison', ASCENDING), ('journee', ASCENDING)],
+               name='equipe_ligue_saison_journee'),
+]
+
+
+def index_specs(ligues=('ligue1',)):
+    """Index attendus par collection pour les compétitions données"""
+    specs = {HISTORY_COLLECTION: HISTORY_INDEXES}
+    for ligue in ligues:
+        specs[f'{ligue}_teams'] = TEAM_INDEXES
+        specs[f'{ligue}_stats'] = STATS_INDEXES
+        specs[f'{ligue}_matches'] = MATCH_INDEXES
+        specs[f'{ligue}_simulations'] = SIMULATION_INDEXES
+    return specs
+
+
+def _duplicates_pipeline(keys):
+    """Groupes de documents partageant la même clé, du plus récent au plus ancien"""
+    return [
+        {'$sort': {'scraped_date': -1, '_id': -1}},
+        {'$group': {'_id': {key: f'${key}' for key in keys}, 'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}},
+    ]
+
+
+def _stale_ids(groups):
+    """Documents à supprimer : tous sauf le plus récent de chaque groupe"""
+    return [_id for group in groups for _id in group['ids'][1:]]
+
+
+def _missing_indexes(collection, models, existing):
+    """Index de la spécification absents de la collection"""
+    return [model for model in models if model.document['name'] not in existing]
+
+
+def remove_duplicates(collection, keys):
+    """Supprime les doublons d'une clé (ex: anciens insert_one), en gardant le plus récent"""
+    stale = _stale_ids(collection.aggregate(_duplicates_pipeline(keys), allowDiskUse=True))
+    for start in range(0, len(stale), DELETE_BATCH_SIZE):
+        collection.delete_many({'_id': {'$in': stale[start:start + DELETE_BATCH_SIZE]}})
+    return len(stale)
+
+
+def ensure_indexes(db, ligues=('ligue1',)):
+    """Crée les index manquants (sans effet sur les index déjà présents)
+
+    Chaque index est créé séparément : un échec n'empêche pas la création des autres.
+    Avant un index unique, les doublons hérités d'anciennes versions sont supprimés.
+    Retourne la liste des index en erreur ("collection.nom").
+    """
+    failed = []
+    for collection, models in index_specs(ligues).items():
+        try:
+            missing = _missing_indexes(db[collection], models, db[collection].index_information())
+        except PyMongoError as e:
+            logger.error(f'Could not list indexes of {collection}: {e}')
+            failed.extend(f"{collection}.{model.document['name']}" for model in models)
+            continue
+        for model in missing:
+            name = model.document['name']
+            try:
+                if model.document.get('unique'):
+                    removed = remove_duplicates(db[collection], list(model.document['key']))
+                    if removed:
+                        logger.warning(f'Removed {removed} duplicate documents from {collection} before building {name}')
+                db[collection].create_indexes([model])
+            except PyMongoError as e:
+                logger.error(f'Could not create index {name} on {collection}: {e}')
+                failed.append(f'{collection}.{name}')
+    return failed
+
+
+async def remove_duplicates_async(collection, keys):
+    """Variante de remove_duplicates pour une collection Motor"""
+    groups = await collection.aggregate(_duplicates_pipeline(keys), allowDiskUse=True).to_list(None)
+    stale = _stale_ids(groups)
+    for start in range(0, len(stale), DELETE_BATCH_SIZE):
+        await collection.delete_many({'_id': {'$in': stale[start:start + DELETE_BATCH_SIZE]}})
+    return len(stale)
+
+
+async def ensure_indexes_async(db, ligues=('ligue1',)):
+    """Variante de ensure_indexes pour une base Motor (asyncio)"""
+    failed = []
+    for collection, models in index_specs(ligues).items():
+        try:
+            missing = _missing_indexes(db[collection], models, await db[collection].index_information())
+        except PyMongoError as e:
+            logger.error(f'Could not list indexes of {collection}: {e}')
+            failed.extend(f"{collection}.{model.document['name']}" for model in models)
+            continue
+        for model in missing:
+            name = model.document['name']
+            try:
+                if model.document.get('unique'):
+                    removed = await remove_duplicates_async(db[collection], list(model.document['key']))
+                    if removed:
+                        logger.warning(f'Removed {removed} duplicate documents from {collection} before building {name}')
+                await db[collection].create_indexes([model])
+            except PyMongoError as e:
+                logger.error(f'Could not create index {name} on {collection}: {e}')
+                failed.append(f'{collection}.{name}')
+    return failed
+
+
+# Plans évalués mais non retenus par l'optimiseur
+IGNORED_PLAN_KEYS = ('rejectedPlans', 'allPlansExecution')
+
+
+def plan_stages(explain):
+    """Liste des étapes ('stage') des plans retenus, à toute profondeur"""
+    stages = []
+    if isinstance(explain, dict):
+        if isinstance(explain.get('stage'), str):
+            stages.append(explain['stage'])
+        for key, value in explain.items():
+            if key not in IGNORED_PLAN_KEYS:
+                stages.extend(plan_stages(value))
+    elif isinstance(explain, list):
+        for value in explain:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+def uses_collscan(explain):
+    """Vrai si un plan retenu parcourt toute une collection"""
+    return 'COLLSCAN' in plan_stages(explain)
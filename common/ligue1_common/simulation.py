@@ -0,0 +1,298 @@
+"""
+Simulation Monte Carlo de la fin de saison
+
+Les matchs restants (toutes les affiches aller-retour moins les matchs déjà joués) sont
+simulés par lots NumPy : buts tirés selon une loi de Poisson dont l'espérance dépend de
+l'attaque et de la défense des deux équipes, estimées sur la saison en cours. Les tirages
+se font par inversion de la fonction de répartition, précalculée par match (plusieurs fois
+plus rapide que Generator.poisson). Les lots sont répartis sur un pool de processus, chacun
+avec sa propre graine (SeedSequence.spawn).
+
+Le classement final d'une simulation départage les égalités de points par la différence
+de buts puis les buts marqués ; les confrontations directes ne sont pas recalculées et un
+tirage aléatoire départage en dernier.
+
+Lancée par le scheduler après les crawls (jamais dans les workers du dashboard) ; le résultat
+est mis en cache dans <ligue>_simulations par (saison, journée) avec l'empreinte du classement,
+et n'est recalculé que lorsque celui-ci change.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+
+import numpy as np
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+SIMULATION_COLLECTION = '{ligue}_simulations'
+META_COLLECTION = 'ligue1_meta'
+
+# Matchs "moyens" ajoutés à chaque équipe : attaque et défense proches de la moyenne en début de saison
+PRIOR_MATCHES = 5
+# Buts moyens par match quand aucun résultat n'est disponible
+DEFAULT_HOME_GOALS = 1.5
+DEFAULT_AWAY_GOALS = 1.2
+# Lots dimensionnés pour rester dans le cache du processeur
+BATCH_SIZE = 1000
+# Probabilité négligée au-delà du nombre de buts maximal d'une table de tirage
+POISSON_TAIL = 1e-7
+
+
+def zones(n_teams):
+    """Zones du classement final (positions incluses), ex: Ligue 1 à 18 équipes"""
+    return {
+        'titre': (1, 1),
+        'ligue_des_champions': (1, 4),
+        'barrage': (n_teams - 2, n_teams - 2),
+        'relegation': (n_teams - 1, n_teams),
+    }
+
+
+class SeasonState:
+    """Classement actuel et matchs restants, prêts à être simulés"""
+
+    def __init__(self, teams, points, difference, goals_for, home, away, home_rate, away_rate):
+        self.teams = list(teams)
+        self.points = np.asarray(points, dtype=np.int32)
+        self.difference = np.asarray(difference, dtype=np.int32)
+        self.goals_for = np.asarray(goals_for, dtype=np.int32)
+        self.home = np.asarray(home, dtype=np.intp)
+        self.away = np.asarray(away, dtype=np.intp)
+        self.home_rate = np.asarray(home_rate, dtype=np.float64)
+        self.away_rate = np.asarray(away_rate, dtype=np.float64)
+
+    @property
+    def n_teams(self):
+        return len(self.teams)
+
+    @property
+    def n_fixtures(self):
+        return len(self.home)
+
+    @classmethod
+    def from_documents(cls, teams, matches, prior_matches=PRIOR_MATCHES):
+        """État à partir de <ligue>_teams (classement) et <ligue>_matches (matchs joués)
+
+        Lève ValueError si les résultats ne correspondent pas au classement (équipe inconnue,
+        nombre de matchs joués différent) : les matchs restants seraient faux.
+        """
+        teams = sorted(teams, key=lambda team: team['position'])
+        names = [team['equipe'] for team in teams]
+        index = {name: i for i, name in enumerate(names)}
+        n = len(names)
+
+        played = np.zeros((n, n), dtype=bool)
+        goals = []
+        for match in matches:
+            home, away = index.get(match['equipe_domicile']), index.get(match['equipe_exterieur'])
+            if home is None or away is None:
+                raise ValueError(f"Équipe absente du classement: {match['equipe_domicile']} - {match['equipe_exterieur']}")
+            played[home, away] = True
+            goals.append((match['buts_domicile'], match['buts_exterieur']))
+
+        matchs_joues = np.array([team['matchs_joues'] for team in teams])
+        counted = played.sum(axis=0) + played.sum(axis=1)
+        if not np.array_equal(counted, matchs_joues):
+            mismatched = [names[i] for i in np.flatnonzero(counted != matchs_joues)]
+            raise ValueError(f'Résultats incomplets pour: {", ".join(mismatched)}')
+
+        # Affiches restantes : toutes les paires ordonnées (domicile, extérieur) non jouées
+        remaining = ~played
+        np.fill_diagonal(remaining, False)
+        home, away = np.nonzero(remaining)
+
+        # Espérance de buts : moyenne domicile / extérieur × attaque × défense adverse
+        if goals:
+            home_goals, away_goals = np.mean(goals, axis=0)
+        else:
+            home_goals, away_goals = DEFAULT_HOME_GOALS, DEFAULT_AWAY_GOALS
+        average = (home_goals + away_goals) / 2
+        goals_for = np.array([team['buts_pour'] for team in teams])
+        goals_against = np.array([team['buts_contre'] for team in teams])
+        attack = (goals_for + prior_matches * average) / (matchs_joues + prior_matches) / average
+        defense = (goals_against + prior_matches * average) / (matchs_joues + prior_matches) / average
+
+        return cls(
+            names,
+            points=[team['points'] for team in teams],
+            difference=goals_for - goals_against,
+            goals_for=goals_for,
+            home=home,
+            away=away,
+            home_rate=home_goals * attack[home] * defense[away],
+            away_rate=away_goals * attack[away] * defense[home]
+        )
+
+
+def poisson_cdf(rates, tail=POISSON_TAIL):
+    """Fonction de répartition de Poisson par match : tableau (buts, matchs) en float32
+
+    La ligne k vaut P(X <= k) ; le nombre de lignes s'arrête quand la queue restante
+    est inférieure à ``tail`` pour tous les matchs.
+    """
+    if not len(rates):
+        return np.ones((1, 0), dtype=np.float32)
+    pmf = np.exp(-rates)
+    rows = [pmf]
+    k = 0
+    while 1 - np.sum(rows, axis=0).min() > tail:
+        k += 1
+        pmf = pmf * rates / k
+        rows.append(pmf)
+    return np.cumsum(rows, axis=0).astype(np.float32)
+
+
+def draw_goals(rng, cdf, size):
+    """Buts tirés par inversion : nombre de seuils de la fonction de répartition dépassés"""
+    uniform = rng.random((size, cdf.shape[1]), dtype=np.float32)
+    goals = np.zeros_like(uniform)
+    for threshold in cdf[:-1]:
+        goals += uniform > threshold
+    return goals
+
+
+def simulate_positions(state, n_simulations, seed, batch_size=BATCH_SIZE):
+    """Nombre de fois où chaque équipe termine à chaque position : tableau (n_equipes, n_equipes)"""
+    rng = np.random.default_rng(seed)
+    n = state.n_teams
+    # Matrices d'incidence match -> équipe : les totaux d'un lot sont deux produits matriciels
+    home_matrix = np.zeros((state.n_fixtures, n), dtype=np.float32)
+    away_matrix = np.zeros((state.n_fixtures, n), dtype=np.float32)
+    home_matrix[np.arange(state.n_fixtures), state.home] = 1
+    away_matrix[np.arange(state.n_fixtures), state.away] = 1
+
+    home_cdf, away_cdf = poisson_cdf(state.home_rate), poisson_cdf(state.away_rate)
+
+    counts = np.zeros(n * n, dtype=np.int64)
+    columns = np.tile(np.arange(n), batch_size)
+    done = 0
+    while done < n_simulations:
+        size = min(batch_size, n_simulations - done)
+        home_goals = draw_goals(rng, home_cdf, size)
+        away_goals = draw_goals(rng, away_cdf, size)
+        draw = (home_goals == away_goals).astype(np.float32)
+        home_points = 3 * (home_goals > away_goals) + draw
+        away_points = 3 * (away_goals > home_goals) + draw
+
+        points = state.points + home_points @ home_matrix + away_points @ away_matrix
+        difference = state.difference + (home_goals - away_goals) @ (home_matrix - away_matrix)
+        goals_for = state.goals_for + home_goals @ home_matrix + away_goals @ away_matrix
+
+        # order[s, k] : équipe classée k+1 dans la simulation s
+        order = np.lexsort((rng.random((size, n)), -goals_for, -difference, -points), axis=-1)
+        counts += np.bincount(order.ravel() * n + columns[:size * n], minlength=n * n)
+        done += size
+    return counts.reshape(n, n)
+
+
+def run_simulations(state, n_simulations=100_000, workers=None, seed=None):
+    """Distribution des positions finales, lots répartis sur ``workers`` processus
+
+    Les processus sont lancés en mode spawn : rien n'est hérité du processus appelant
+    (reactor, pool MongoDB).
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, n_simulations // (10 * BATCH_SIZE) or 1))
+    if not state.n_fixtures:
+        workers = 1             # Saison terminée : classement final connu
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    chunks = [n_simulations // workers + (i < n_simulations % workers) for i in range(workers)]
+
+    if workers == 1:
+        return simulate_positions(state, chunks[0], seeds[0])
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        results = executor.map(simulate_positions, [state] * workers, chunks, seeds)
+        return sum(results)
+
+
+def summarize(state, counts):
+    """Probabilités par zone et position moyenne, par équipe (ordre du classement actuel)"""
+    n_simulations = counts[0].sum()
+    probabilities = counts / n_simulations
+    positions = np.arange(1, state.n_teams + 1)
+    teams = []
+    for i, name in enumerate(state.teams):
+        team = {'equipe': name, 'points': int(state.points[i])}
+        for zone, (first, last) in zones(state.n_teams).items():
+            team[zone] = float(probabilities[i, first - 1:last].sum())
+        team['position_moyenne'] = float(probabilities[i] @ positions)
+        teams.append(team)
+    return teams
+
+
+def standings_hash(teams, matches):
+    """Empreinte du classement et des résultats : la simulation n'est relancée que si elle change"""
+    fields = ('equipe', 'points', 'matchs_joues', 'buts_pour', 'buts_contre')
+    payload = {
+        'teams': sorted([team.get(field) for field in fields] for team in teams),
+        'matches': sorted([m['equipe_domicile'], m['equipe_exterieur'], m['buts_domicile'], m['buts_exterieur']]
+                          for m in matches),
+    }
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def simulate_if_changed(db, saison, ligue='ligue1', n_simulations=100_000, workers=None):
+    """Simule la fin de saison si le classement a changé depuis la dernière simulation
+
+    Retourne le document enregistré, ou None si rien n'a été recalculé.
+    """
+    collection = SIMULATION_COLLECTION.format(ligue=ligue)
+    try:
+        teams = list(db[f'{ligue}_teams'].find({'saison': saison}, {'_id': 0}))
+        matches = list(db[f'{ligue}_matches'].find(
+            {'saison': saison},
+            {'_id': 0, 'equipe_domicile': 1, 'equipe_exterieur': 1, 'buts_domicile': 1, 'buts_exterieur': 1}
+        ))
+        if not teams:
+            logger.info(f'No standings to simulate ({ligue} {saison})')
+            return None
+
+        journee = max(team.get('matchs_joues') or 0 for team in teams)
+        state_hash = standings_hash(teams, matches)
+        cached = db[collection].find_one({'saison': saison, 'journee': journee}, {'standings_hash': 1})
+        if cached and cached.get('standings_hash') == state_hash:
+            logger.info(f'Standings unchanged, simulation cached ({ligue} {saison} J{journee})')
+            return None
+    except PyMongoError as e:
+        logger.error(f'Could not load standings for simulation: {e}')
+        return None
+
+    try:
+        state = SeasonState.from_documents(teams, matches)
+    except ValueError as e:
+        logger.warning(f'Simulation skipped ({ligue} {saison}): {e}')
+        return None
+
+    started = time.perf_counter()
+    counts = run_simulations(state, n_simulations, workers)
+    doc = {
+        'ligue': ligue,
+        'saison': saison,
+        'journee': journee,
+        'standings_hash': state_hash,
+        'n_simulations': n_simulations,
+        'matchs_restants': state.n_fixtures,
+        'duration_s': round(time.perf_counter() - started, 3),
+        'computed_at': datetime.now(),
+        'teams': summarize(state, counts),
+    }
+
+    try:
+        db[collection].update_one({'saison': saison, 'journee': journee}, {'$set': doc}, upsert=True)
+        # Invalidation du cache du dashboard, comme après une écriture du pipeline
+        db[META_COLLECTION].update_one(
+            {'_id': 'data_version'},
+            {'$inc': {'version': 1}, '$set': {'updated_at': datetime.now()}},
+            upsert=True
+        )
+    except PyMongoError as e:
+        logger.error(f'Could not store simulation: {e}')
+        return None
+    return doc
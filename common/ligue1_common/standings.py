@@ -0,0 +1,240 @@
+"""
+Moteur de classement vectorisé (NumPy)
+
+Calcule le classement d'une saison à partir des résultats match par match
+(collection <ligue>_matches), à une date donnée ou pour toutes les journées à la fois.
+Les champs produits sont ceux de Ligue1TeamItem.
+
+Départage des égalités de points (règlement LFP) :
+    1. différence de buts générale
+    2. points, puis différence de buts, puis buts marqués dans les confrontations directes
+       entre équipes à égalité
+    3. buts marqués, puis buts marqués à l'extérieur
+Le classement du fair-play n'étant pas disponible, l'ordre alphabétique départage en dernier.
+"""
+from datetime import datetime
+import numpy as np
+
+# Compteurs cumulés par équipe (dernier axe des tableaux)
+COUNTERS = ('matchs_joues', 'victoires', 'nuls', 'defaites', 'buts_pour', 'buts_contre', 'buts_exterieur')
+# Confrontations directes, pour l'équipe i contre l'équipe j
+H2H = ('points', 'buts_pour', 'buts_contre')
+FORM_LENGTH = 5
+
+
+def _first_seen(doc):
+    return doc.get('first_seen') or doc.get('date')
+
+
+def _journee_estimee(doc):
+    estimated = doc.get('journee_estimee')
+    if estimated is None:
+        return bool(doc.get('journee')) and _first_seen(doc) is None
+    return estimated
+
+
+class SeasonMatches:
+    """Résultats d'une saison sous forme de tableaux (une case par match)
+
+    ``journee`` vaut 0 quand elle est inconnue ou seulement estimée (journee_estimee, voir
+    Ligue1MatchesSpider). ``first_seen`` est la date de première observation du résultat par
+    le spider (NaT si inconnue), pas la date du match.
+    """
+
+    def __init__(self, teams, home, away, home_goals, away_goals, journee=None, first_seen=None):
+        self.teams = list(teams)
+        self.home = np.asarray(home, dtype=np.intp)
+        self.away = np.asarray(away, dtype=np.intp)
+        self.home_goals = np.asarray(home_goals, dtype=np.int32)
+        self.away_goals = np.asarray(away_goals, dtype=np.int32)
+        n_matches = len(self.home)
+        self.journee = (np.zeros(n_matches, dtype=np.int32) if journee is None
+                        else np.asarray(journee, dtype=np.int32))
+        self.first_seen = (np.full(n_matches, np.datetime64('NaT'), dtype='datetime64[s]') if first_seen is None
+                           else np.asarray(first_seen, dtype='datetime64[s]'))
+
+    @classmethod
+    def from_documents(cls, docs, teams=None):
+        """Documents de <ligue>_matches -> tableaux ; équipes triées par nom si non fournies
+
+        Lignes antérieures au champ journee_estimee : première observation dans ``date``,
+        journée estimée si aucune première observation n'est connue.
+        """
+        docs = list(docs)
+        if teams is None:
+            teams = sorted({doc['equipe_domicile'] for doc in docs} | {doc['equipe_exterieur'] for doc in docs})
+        index = {team: i for i, team in enumerate(teams)}
+        return cls(
+            teams,
+            home=[index[doc['equipe_domicile']] for doc in docs],
+            away=[index[doc['equipe_exterieur']] for doc in docs],
+            home_goals=[doc['buts_domicile'] for doc in docs],
+            away_goals=[doc['buts_exterieur'] for doc in docs],
+            journee=[0 if _journee_estimee(doc) else doc.get('journee') or 0 for doc in docs],
+            first_seen=[_first_seen(doc) or 'NaT' for doc in docs]
+        )
+
+    def __len__(self):
+        return len(self.home)
+
+    @property
+    def n_teams(self):
+        return len(self.teams)
+
+    @property
+    def n_journees(self):
+        """Nombre de journées d'une saison complète (aller-retour), ou plus si la base en contient plus"""
+        return max(2 * (self.n_teams - 1), int(self.journee.max(initial=0)))
+
+    def subset(self, mask):
+        """Matchs sélectionnés par un masque booléen (mêmes équipes)"""
+        return SeasonMatches(self.teams, self.home[mask], self.away[mask], self.home_goals[mask],
+                             self.away_goals[mask], self.journee[mask], self.first_seen[mask])
+
+    def points(self):
+        """Points (domicile, extérieur) de chaque match"""
+        home_win = self.home_goals > self.away_goals
+        away_win = self.home_goals < self.away_goals
+        draw = ~(home_win | away_win)
+        return 3 * home_win + draw, 3 * away_win + draw
+
+
+class Standings:
+    """Classements calculés : un tableau (n_classements, n_equipes) par champ
+
+    Le classement k contient les matchs du groupe 0 à k (ex: journées 1 à k+1).
+    """
+
+    def __init__(self, matches, counters, h2h, groups):
+        self.matches = matches
+        self.teams = matches.teams
+        self.groups = groups                # groupe (journée) de chaque match, -1 si exclu
+        self.fields = {name: counters[..., i] for i, name in enumerate(COUNTERS)}
+        self.fields['points'] = 3 * self.fields['victoires'] + self.fields['nuls']
+        self.fields['difference'] = self.fields['buts_pour'] - self.fields['buts_contre']
+        self.fields['position'] = rank(self.fields, h2h)
+
+    def __len__(self):
+        return self.fields['position'].shape[0]
+
+    def __getitem__(self, name):
+        return self.fields[name]
+
+    def table(self, index=-1, ligue=None, saison=None, scraped_date=None):
+        """Documents du classement ``index`` (mêmes champs que Ligue1TeamItem), triés par position"""
+        index = range(len(self))[index]
+        forms = self.forms(index)
+        scraped_date = scraped_date or datetime.now()
+        docs = []
+        for i, team in enumerate(self.teams):
+            doc = {'ligue': ligue, 'saison': saison, 'equipe': team, 'forme': forms[i], 'scraped_date': scraped_date}
+            for name in ('position', 'points', 'matchs_joues', 'victoires', 'nuls', 'defaites',
+                         'buts_pour', 'buts_contre', 'difference'):
+                doc[name] = int(self.fields[name][index, i])
+            docs.append(doc)
+        return sorted(docs, key=lambda doc: doc['position'])
+
+    def forms(self, index=-1):
+        """Forme (5 derniers résultats, du plus ancien au plus récent, ex: "VVNDV") de chaque équipe"""
+        index = range(len(self))[index]
+        played = np.flatnonzero((self.groups >= 0) & (self.groups <= index))
+        # Ordre chronologique : journée, puis première observation (matchs reportés)
+        played = played[np.lexsort((self.matches.first_seen[played], self.groups[played]))]
+        home_points, away_points = self.matches.points()
+        letters = {3: 'V', 1: 'N', 0: 'D'}
+        results = [[] for _ in self.teams]
+        for m in played:
+            results[self.matches.home[m]].append(letters[int(home_points[m])])
+            results[self.matches.away[m]].append(letters[int(away_points[m])])
+        return [''.join(result[-FORM_LENGTH:]) for result in results]
+
+
+def accumulate(matches, groups, n_groups):
+    """Compteurs cumulés par groupe de matchs
+
+    Retourne (counters, h2h) de formes (n_groups, n, len(COUNTERS)) et (n_groups, n, n, len(H2H)).
+    Les matchs de groupe négatif sont ignorés.
+    """
+    n = matches.n_teams
+    kept = groups >= 0
+    groups = groups[kept]
+    home, away = matches.home[kept], matches.away[kept]
+    home_goals, away_goals = matches.home_goals[kept], matches.away_goals[kept]
+    home_points, away_points = matches.points()
+    home_points, away_points = home_points[kept], away_points[kept]
+
+    ones = np.ones_like(home_goals)
+    zeros = np.zeros_like(home_goals)
+    home_win = home_points == 3
+    away_win = away_points == 3
+    draw = home_points == 1
+    home_rows = np.stack([ones, home_win, draw, away_win, home_goals, away_goals, zeros], axis=1)
+    away_rows = np.stack([ones, away_win, draw, home_win, away_goals, home_goals, away_goals], axis=1)
+
+    counters = np.zeros((n_groups, n, len(COUNTERS)), dtype=np.int32)
+    np.add.at(counters, (groups, home), home_rows)
+    np.add.at(counters, (groups, away), away_rows)
+
+    h2h = np.zeros((n_groups, n, n, len(H2H)), dtype=np.int32)
+    np.add.at(h2h, (groups, home, away), np.stack([home_points, home_goals, away_goals], axis=1))
+    np.add.at(h2h, (groups, away, home), np.stack([away_points, away_goals, home_goals], axis=1))
+
+    return counters.cumsum(axis=0), h2h.cumsum(axis=0)
+
+
+def rank(fields, h2h):
+    """Positions (1 = premier) de chaque équipe, pour chaque classement (axe 0)"""
+    points, difference = fields['points'], fields['difference']
+    n_tables, n = points.shape
+
+    # Confrontations directes restreintes aux équipes à égalité de points et de différence
+    tied = ((points[:, :, None] == points[:, None, :])
+            & (difference[:, :, None] == difference[:, None, :]))
+    h2h_points = (h2h[..., 0] * tied).sum(axis=-1)
+    h2h_goals = (h2h[..., 1] * tied).sum(axis=-1)
+    h2h_difference = h2h_goals - (h2h[..., 2] * tied).sum(axis=-1)
+
+    # np.lexsort : la dernière clé est la clé principale ; équipes dans l'ordre alphabétique
+    alphabetical = np.broadcast_to(np.arange(n), (n_tables, n))
+    order = np.lexsort((
+        alphabetical,
+        -fields['buts_exterieur'],
+        -fields['buts_pour'],
+        -h2h_goals,
+        -h2h_difference,
+        -h2h_points,
+        -difference,
+        -points,
+    ), axis=-1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(1, n + 1), axis=-1)
+    return positions
+
+
+def standings_by_journee(matches, n_journees=None):
+    """Classement après chaque journée (indice k = journée k+1), en un seul calcul
+
+    Les matchs de journée inconnue ou estimée (0) ne sont pas comptés : voir standings_at.
+    """
+    n_journees = n_journees or matches.n_journees
+    groups = np.where(matches.journee > 0, matches.journee - 1, -1)
+    groups = np.where(groups < n_journees, groups, -1)
+    counters, h2h = accumulate(matches, groups, n_journees)
+    return Standings(matches, counters, h2h, groups)
+
+
+def standings_at(matches, date=None, journee=None):
+    """Classement unique avec les matchs observés jusqu'à ``date`` et/ou joués jusqu'à ``journee``
+
+    ``date`` porte sur la première observation (first_seen) : les matchs chargés au premier
+    crawl de la saison (first_seen inconnue) sont comptés pour toute date. Ceux de journée
+    inconnue ou estimée sont exclus dès qu'une journée est demandée.
+    """
+    included = np.ones(len(matches), dtype=bool)
+    if date is not None:
+        included &= np.isnat(matches.first_seen) | (matches.first_seen <= np.datetime64(date, 's'))
+    if journee is not None:
+        included &= (matches.journee > 0) & (matches.journee <= journee)
+    groups = np.where(included, 0, -1)
+    counters, h2h = accumulate(matches, groups, 1)
+    return Standings(matches, counters, h2h, groups)
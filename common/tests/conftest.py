@@ -0,0 +1,5 @@
+import os
+import sys
+
+# ligue1_common n'est pas installé : import depuis common/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
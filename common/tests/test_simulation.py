@@ -0,0 +1,80 @@
+"""Simulation de fin de saison : état initial (SeasonState.from_documents), zones et probabilités"""
+import numpy as np
+import pytest
+
+from ligue1_common.simulation import SeasonState, run_simulations, summarize, zones
+from ligue1_common.standings import SeasonMatches, standings_at
+
+TEAMS = ['A', 'B', 'C', 'D']
+
+
+def match(home, away, home_goals, away_goals):
+    return {'equipe_domicile': home, 'equipe_exterieur': away,
+            'buts_domicile': home_goals, 'buts_exterieur': away_goals}
+
+
+def first_legs():
+    """Matchs aller : l'équipe la mieux classée (ordre alphabétique) gagne 2-1"""
+    return [match(home, away, 2, 1) for i, home in enumerate(TEAMS) for away in TEAMS[i + 1:]]
+
+
+def return_legs():
+    """Matchs retour : l'équipe la mieux classée gagne 1-2 à l'extérieur"""
+    return [match(away, home, 1, 2) for i, home in enumerate(TEAMS) for away in TEAMS[i + 1:]]
+
+
+def table(matches):
+    """Documents <ligue>_teams correspondant aux résultats"""
+    return standings_at(SeasonMatches.from_documents(matches)).table()
+
+
+def test_zones():
+    assert zones(18) == {'titre': (1, 1), 'ligue_des_champions': (1, 4), 'barrage': (16, 16), 'relegation': (17, 18)}
+
+
+def test_finished_season_is_certain():
+    matches = first_legs() + return_legs()
+    state = SeasonState.from_documents(table(matches), matches)
+    assert state.n_fixtures == 0
+    assert state.teams == TEAMS
+
+    teams = summarize(state, run_simulations(state, n_simulations=200, seed=0))
+    # 4 équipes : titre 1, Ligue des champions 1-4, barrage 2, relégation 3-4
+    assert [team['titre'] for team in teams] == [1.0, 0.0, 0.0, 0.0]
+    assert [team['ligue_des_champions'] for team in teams] == [1.0, 1.0, 1.0, 1.0]
+    assert [team['barrage'] for team in teams] == [0.0, 1.0, 0.0, 0.0]
+    assert [team['relegation'] for team in teams] == [0.0, 0.0, 1.0, 1.0]
+    assert [team['position_moyenne'] for team in teams] == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_remaining_fixtures_are_unplayed_pairs():
+    matches = first_legs()
+    state = SeasonState.from_documents(table(matches), matches)
+    remaining = {(state.teams[h], state.teams[a]) for h, a in zip(state.home, state.away)}
+    assert remaining == {(m['equipe_exterieur'], m['equipe_domicile']) for m in matches}
+    assert np.all(state.home_rate > 0) and np.all(state.away_rate > 0)
+
+
+def test_probabilities_sum_to_one():
+    matches = first_legs()
+    state = SeasonState.from_documents(table(matches), matches)
+    counts = run_simulations(state, n_simulations=2000, seed=1)
+    assert counts.sum(axis=0).tolist() == [2000] * len(TEAMS)
+    assert counts.sum(axis=1).tolist() == [2000] * len(TEAMS)
+    teams = summarize(state, counts)
+    assert sum(team['titre'] for team in teams) == pytest.approx(1.0)
+    assert sum(team['relegation'] for team in teams) == pytest.approx(2.0)
+
+
+def test_matchs_joues_mismatch():
+    matches = first_legs()
+    teams = table(matches)
+    teams[0]['matchs_joues'] += 1
+    with pytest.raises(ValueError, match=teams[0]['equipe']):
+        SeasonState.from_documents(teams, matches)
+
+
+def test_unknown_team():
+    matches = first_legs()
+    with pytest.raises(ValueError):
+        SeasonState.from_documents(table(matches), matches + [match('A', 'Z', 1, 0)])
@@ -0,0 +1,88 @@
+"""Moteur de classement : départage des égalités (rank) et journées inconnues ou estimées"""
+from datetime import datetime
+
+from ligue1_common.standings import SeasonMatches, standings_at, standings_by_journee
+
+
+def matches(teams, results, journees=None):
+    """results : [(domicile, extérieur, buts domicile, buts extérieur)]"""
+    index = {team: i for i, team in enumerate(teams)}
+    return SeasonMatches(
+        teams,
+        home=[index[home] for home, _, _, _ in results],
+        away=[index[away] for _, away, _, _ in results],
+        home_goals=[goals for _, _, goals, _ in results],
+        away_goals=[goals for _, _, _, goals in results],
+        journee=journees
+    )
+
+
+def order(standings, index=-1):
+    return [doc['equipe'] for doc in standings.table(index)]
+
+
+def test_points_then_goal_difference():
+    season = matches(['A', 'B', 'C'], [('A', 'B', 1, 0), ('C', 'B', 3, 0), ('A', 'C', 0, 0)])
+    # A et C : 4 points, différence +1 contre +3
+    assert order(standings_at(season)) == ['C', 'A', 'B']
+
+
+def test_head_to_head_before_goals_scored():
+    # A et B : 3 points et différence 0 ; B a marqué plus, mais A a gagné la confrontation directe
+    season = matches(['A', 'B', 'C', 'D'], [('A', 'B', 1, 0), ('C', 'A', 1, 0), ('B', 'D', 4, 3)])
+    standings = standings_at(season)
+    assert order(standings) == ['C', 'A', 'B', 'D']
+    assert standings['buts_pour'][0].tolist() == [1, 4, 1, 3]
+
+
+def test_head_to_head_only_between_tied_teams():
+    # 3 points chacun ; A et B à égalité de différence (0), C (-2) et D (+2) non.
+    # B a battu A : B devant, bien que A ait marqué plus (3 contre 1). Avec C et D dans les
+    # confrontations directes, A et B resteraient à égalité et A passerait devant aux buts.
+    season = matches(
+        ['A', 'B', 'C', 'D'],
+        [('B', 'A', 1, 0), ('A', 'C', 3, 0), ('C', 'B', 1, 0), ('D', 'A', 2, 0)]
+    )
+    standings = standings_at(season)
+    assert standings['points'][0].tolist() == [3, 3, 3, 3]
+    assert standings['difference'][0].tolist() == [0, 0, -2, 2]
+    assert order(standings) == ['D', 'B', 'A', 'C']
+
+
+def test_goals_scored_then_away_goals_then_alphabetical():
+    # X-Y 2-2 : égalité parfaite sauf les buts à l'extérieur (Y) ; P et Q n'ont pas joué
+    season = matches(['P', 'Q', 'X', 'Y'], [('X', 'Y', 2, 2)])
+    assert order(standings_at(season)) == ['Y', 'X', 'P', 'Q']
+
+
+def test_ranking_after_each_journee():
+    season = matches(
+        ['A', 'B', 'C', 'D'],
+        [('A', 'B', 0, 1), ('C', 'D', 2, 0), ('A', 'C', 3, 0), ('B', 'D', 0, 0)],
+        journees=[1, 1, 2, 2]
+    )
+    standings = standings_by_journee(season, n_journees=2)
+    assert order(standings, 0) == ['C', 'B', 'A', 'D']
+    assert order(standings, 1) == ['B', 'A', 'C', 'D']
+
+
+def test_estimated_journees_are_unknown():
+    observed = datetime(2025, 9, 1)
+    docs = [
+        # Journée observée au fil des crawls
+        {'equipe_domicile': 'A', 'equipe_exterieur': 'B', 'buts_domicile': 1, 'buts_exterieur': 0,
+         'journee': 1, 'journee_estimee': False, 'first_seen': observed},
+        # Journée estimée (premier crawl de la saison)
+        {'equipe_domicile': 'B', 'equipe_exterieur': 'A', 'buts_domicile': 2, 'buts_exterieur': 0,
+         'journee': 2, 'journee_estimee': True, 'first_seen': None},
+        # Ligne antérieure au champ journee_estimee : estimée faute de première observation
+        {'equipe_domicile': 'A', 'equipe_exterieur': 'C', 'buts_domicile': 0, 'buts_exterieur': 0,
+         'journee': 3, 'date': None},
+        # Ligne antérieure observée : première observation dans date
+        {'equipe_domicile': 'C', 'equipe_exterieur': 'A', 'buts_domicile': 0, 'buts_exterieur': 3,
+         'journee': 4, 'date': observed},
+    ]
+    season = SeasonMatches.from_documents(docs)
+    assert season.journee.tolist() == [1, 0, 0, 4]
+    assert season.first_seen[[0, 3]].tolist() == [observed, observed]
+    assert standings_at(season, journee=4)['matchs_joues'][0].tolist() == [2, 1, 1]
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Load Test Script
+Simule N écrans / visiteurs du dashboard et mesure la tenue en charge du serveur
+
+Chaque client rejoue, à intervalle régulier (avec gigue), les requêtes
+/_dash-update-component déclenchées dans le navigateur par un changement de version
+des données. Les callbacks sont découverts via /_dash-dependencies.
+Comme assets/data_version.js, chaque client garde en parallèle une requête long-poll
+ouverte sur /data-version ; ses latences sont mesurées à part.
+
+Exemple :
+    python load_test.py --url http://localhost:8050 --clients 200 --duration 120 --interval 10
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from pymongo import MongoClient
+
+TRIGGER = 'data-version.data'
+# Attente avant une nouvelle requête long-poll après une erreur (RETRY_DELAY de data_version.js)
+LONG_POLL_RETRY_DELAY = 10
+# Valeurs envoyées pour les entrées autres que la version (premier affichage du tableau)
+DEFAULT_INPUTS = {
+    'teams-table.page_current': 0,
+    'teams-table.page_size': 20,
+    'teams-table.sort_by': [],
+}
+
+
+def parse_outputs(output):
+    """'..a.children...a-key.data..' -> [{'id': 'a', 'property': 'children'}, ...]"""
+    parts = output.strip('.').split('...') if output.startswith('..') else [output]
+    outputs = []
+    for part in parts:
+        component_id, prop = part.rsplit('.', 1)
+        outputs.append({'id': component_id, 'property': prop})
+    return outputs
+
+
+def discover_callbacks(session, url):
+    """Callbacks serveur déclenchés par la version des données"""
+    dependencies = session.get(f'{url}/_dash-dependencies', timeout=10).json()
+    callbacks = []
+    for dependency in dependencies:
+        if dependency.get('clientside_function'):
+            continue
+        triggers = [f"{i['id']}.{i['property']}" for i in dependency['inputs']]
+        if TRIGGER in triggers:
+            callbacks.append(dependency)
+    return callbacks
+
+
+def callback_body(dependency, version, displayed):
+    """Corps de requête identique à celui qu'enverrait le navigateur"""
+    outputs = parse_outputs(dependency['output'])
+    inputs = []
+    for i in dependency['inputs']:
+        key = f"{i['id']}.{i['property']}"
+        inputs.append({**i, 'value': version if key == TRIGGER else DEFAULT_INPUTS.get(key)})
+    state = [{**s, 'value': displayed.get(f"{s['id']}.{s['property']}")} for s in dependency.get('state', [])]
+    return {
+        'output': dependency['output'],
+        'outputs': outputs if len(outputs) > 1 else outputs[0],
+        'inputs': inputs,
+        'state': state,
+        'changedPropIds': [TRIGGER],
+    }
+
+
+class Results:
+    """Latences et erreurs, partagées par tous les clients"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)      # callback -> [secondes]
+        self.statuses = defaultdict(int)
+        self.errors = 0
+        # Long-poll /data-version, hors des statistiques des callbacks
+        self.long_poll_latencies = []
+        self.long_poll_statuses = defaultdict(int)
+        self.long_poll_errors = 0
+        self.version_changes = 0
+
+    def record(self, name, seconds, status):
+        with self.lock:
+            self.latencies[name].append(seconds)
+            self.statuses[status] += 1
+
+    def error(self):
+        with self.lock:
+            self.errors += 1
+
+    def record_long_poll(self, seconds, status, changed):
+        with self.lock:
+            self.long_poll_latencies.append(seconds)
+            self.long_poll_statuses[status] += 1
+            self.version_changes += changed
+
+    def long_poll_error(self):
+        with self.lock:
+            self.long_poll_errors += 1
+
+
+def long_poll_loop(url, version, args, results, stop):
+    """Boucle de assets/data_version.js : /data-version?since=<version>, relancée dès la réponse"""
+    session = requests.Session()
+    while not stop.is_set():
+        params = {'since': version} if version is not None else {}
+        start = time.perf_counter()
+        try:
+            response = session.get(f'{url}/data-version', params=params, timeout=args.long_poll_timeout)
+        except requests.RequestException:
+            results.long_poll_error()
+            stop.wait(LONG_POLL_RETRY_DELAY)
+            continue
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            results.record_long_poll(elapsed, response.status_code, False)
+            stop.wait(LONG_POLL_RETRY_DELAY)
+            continue
+        new_version = response.json().get('version')
+        results.record_long_poll(elapsed, response.status_code, new_version != version)
+        version = new_version
+
+
+def client_loop(client_id, url, callbacks, version, args, results, stop):
+    """Un écran : rafraîchit tous ses panneaux toutes les `interval` secondes (± gigue)"""
+    session = requests.Session()
+    displayed = {}                  # Empreintes déjà affichées (stores *-key), comme dans le navigateur
+    rng = random.Random(client_id)
+    # Départs étalés sur le premier intervalle
+    if stop.wait(rng.uniform(0, args.interval)):
+        return
+
+    while not stop.is_set():
+        for dependency in callbacks:
+            name = dependency['output'].strip('.').split('.')[0]
+            body = callback_body(dependency, version, displayed)
+            start = time.perf_counter()
+            try:
+                response = session.post(f'{url}/_dash-update-component', json=body, timeout=args.timeout)
+            except requests.RequestException:
+                results.error()
+                continue
+            results.record(name, time.perf_counter() - start, response.status_code)
+            if response.status_code == 200:
+                for component_id, props in response.json().get('response', {}).items():
+                    for prop, value in props.items():
+                        displayed[f'{component_id}.{prop}'] = value
+        if not args.keep_state:
+            displayed.clear()
+        stop.wait(args.interval * rng.uniform(1 - args.jitter, 1 + args.jitter))
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] * 1000 if values else 0.0
+
+
+def mongo_opcounters(mongo_uri):
+    if not mongo_uri:
+        return None
+    try:
+        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+        return dict(client.admin.command('serverStatus')['opcounters'])
+    except Exception as e:
+        print(f'⚠ MongoDB opcounters unavailable: {e}')
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test du dashboard Dash')
+    parser.add_argument('--url', default='http://localhost:8050')
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=60, help='Durée du test (secondes)')
+    parser.add_argument('--interval', type=float, default=10, help='Intervalle entre deux rafraîchissements d\'un client')
+    parser.add_argument('--jitter', type=float, default=0.2, help='Gigue relative de l\'intervalle (0.2 = ±20%%)')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--keep-state', action='store_true',
+                        help='Renvoyer les empreintes affichées (panneaux inchangés -> 204) au lieu de simuler de nouveaux visiteurs')
+    parser.add_argument('--long-poll-timeout', type=float, default=40,
+                        help='Timeout client des requêtes /data-version (supérieur à LONG_POLL_TIMEOUT du serveur)')
+    parser.add_argument('--no-long-poll', action='store_true', help='Ne pas simuler le long-poll de /data-version')
+    parser.add_argument('--mongo-uri', help='URI MongoDB pour mesurer les opérations/s (serverStatus)')
+    args = parser.parse_args()
+
+    session = requests.Session()
+    try:
+        callbacks = discover_callbacks(session, args.url)
+        version = session.get(f'{args.url}/data-version', timeout=args.timeout).json().get('version')
+    except (requests.RequestException, ValueError) as e:
+        print(f'✗ Dashboard unreachable at {args.url}: {e}')
+        sys.exit(1)
+
+    print(f'🎯 {len(callbacks)} callbacks, data version {version!r}')
+    print(f'👥 {args.clients} clients, every {args.interval}s ±{args.jitter:.0%}, for {args.duration}s')
+
+    results = Results()
+    stop = threading.Event()
+    ops_before = mongo_opcounters(args.mongo_uri)
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=client_loop, args=(i, args.url, callbacks, version, args, results, stop), daemon=True)
+        for i in range(args.clients)
+    ]
+    if not args.no_long_poll:
+        threads += [
+            threading.Thread(target=long_poll_loop, args=(args.url, version, args, results, stop), daemon=True)
+            for _ in range(args.clients)
+        ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join(max(args.timeout, args.long_poll_timeout))
+    elapsed = time.perf_counter() - started
+    ops_after = mongo_opcounters(args.mongo_uri)
+
+    all_latencies = [value for values in results.latencies.values() for value in values]
+    print(f"\n{'callback':<22}{'requêtes':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, values in sorted(results.latencies.items()):
+        print(f'{name:<22}{len(values):>10}{percentile(values, 50):>8.1f}ms'
+              f'{percentile(values, 95):>8.1f}ms{percentile(values, 99):>8.1f}ms')
+    print(f"{'TOTAL':<22}{len(all_latencies):>10}{percentile(all_latencies, 50):>8.1f}ms"
+          f'{percentile(all_latencies, 95):>8.1f}ms{percentile(all_latencies, 99):>8.1f}ms')
+
+    print(f'\n⚡ Throughput: {len(all_latencies) / elapsed:.1f} req/s over {elapsed:.0f}s')
+    print(f'📨 Status codes: {dict(results.statuses)}, network errors: {results.errors}')
+
+    if not args.no_long_poll:
+        # Une requête long-poll dure normalement LONG_POLL_TIMEOUT : une réponse plus rapide
+        # signale un changement de version, un 503 une saturation des places long-poll
+        lp = results.long_poll_latencies
+        print(f"\n{'long-poll':<22}{'requêtes':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+        print(f'{"/data-version":<22}{len(lp):>10}{percentile(lp, 50):>8.1f}ms'
+              f'{percentile(lp, 95):>8.1f}ms{percentile(lp, 99):>8.1f}ms')
+        print(f'🔔 Version changes seen: {results.version_changes}, '
+              f'status codes: {dict(results.long_poll_statuses)}, network errors: {results.long_poll_errors}')
+    if ops_before and ops_after:
+        rates = {op: (ops_after[op] - ops_before.get(op, 0)) / elapsed for op in ops_after}
+        print('🍃 MongoDB ops/s: ' + ', '.join(f'{op} {rate:.1f}' for op, rate in rates.items()))
+
+
+if __name__ == '__main__':
+    main()
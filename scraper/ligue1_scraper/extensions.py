@@ -0,0 +1,67 @@
+from prometheus_client import write_to_textfile
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+import os
+import time
+
+from ligue1_scraper import metrics
+
+
+class CrawlMetrics:
+    """Alimente les métriques Prometheus du crawl et les écrit dans un fichier texte
+
+    Le fichier (format texte Prometheus) est réécrit à la fin de chaque crawl ;
+    le scheduler expose en plus le même registre en HTTP.
+    """
+
+    def __init__(self, textfile=None):
+        self.textfile = textfile
+        self.started = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('METRICS_ENABLED', True):
+            raise NotConfigured
+        extension = cls(textfile=crawler.settings.get('METRICS_TEXTFILE'))
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(extension.response_received, signal=signals.response_received)
+        crawler.signals.connect(extension.item_scraped, signal=signals.item_scraped)
+        crawler.signals.connect(extension.item_dropped, signal=signals.item_dropped)
+        crawler.signals.connect(extension.page_parsed, signal=metrics.page_parsed)
+        return extension
+
+    def spider_opened(self, spider):
+        self.started = time.monotonic()
+
+    def spider_closed(self, spider, reason):
+        metrics.CRAWL_RUNS.labels(reason).inc()
+        metrics.CRAWL_DURATION.observe(time.monotonic() - self.started)
+        metrics.LAST_CRAWL.set_to_current_time()
+        self.write_textfile(spider)
+
+    def response_received(self, response, request, spider):
+        # Réponses rejouées depuis le cache : pas de téléchargement
+        latency = request.meta.get('download_latency')
+        if latency is not None and 'cached' not in response.flags:
+            metrics.DOWNLOAD_LATENCY.labels(str(response.status)).observe(latency)
+
+    def item_scraped(self, item, response, spider):
+        metrics.ITEMS.labels('scraped').inc()
+
+    def item_dropped(self, item, response, exception, spider):
+        metrics.ITEMS.labels('dropped').inc()
+
+    def page_parsed(self, spider, ligue, seconds, rows, dropped):
+        metrics.PARSE_TIME.labels(ligue).observe(seconds)
+        metrics.ROWS_PARSED.labels(ligue).inc(rows)
+        metrics.ROWS_DROPPED.labels(ligue).inc(dropped)
+
+    def write_textfile(self, spider):
+        if not self.textfile:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.textfile) or '.', exist_ok=True)
+            write_to_textfile(self.textfile, metrics.REGISTRY)
+        except OSError as e:
+            spider.logger.warning(f'Could not write metrics to {self.textfile}: {e}')
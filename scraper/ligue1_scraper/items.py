@@ -4,6 +4,8 @@ from datetime import datetime
 
 class Ligue1TeamItem(scrapy.Item):
     """Item pour les équipes de Ligue 1"""
+    ligue = scrapy.Field()              # Compétition (ex: "ligue1")
+    saison = scrapy.Field()             # Saison (ex: "2025-2026")
     position = scrapy.Field()           # Classement (1-20)
     equipe = scrapy.Field()             # Nom de l'équipe
     points = scrapy.Field()             # Points totaux
@@ -20,8 +22,23 @@ class Ligue1TeamItem(scrapy.Item):
 
 class Ligue1StatsItem(scrapy.Item):
     """Item pour les statistiques générales"""
+    ligue = scrapy.Field()              # Compétition (ex: "ligue1")
     saison = scrapy.Field()             # Saison (ex: "2025-2026")
     journee = scrapy.Field()            # Journée en cours
     total_equipes = scrapy.Field()      # Nombre total d'équipes
     total_matchs = scrapy.Field()       # Total de matchs joués
     scraped_date = scrapy.Field()       # Date du scraping
+
+
+class Ligue1MatchItem(scrapy.Item):
+    """Item pour un match joué (grille des résultats de la saison)"""
+    ligue = scrapy.Field()              # Compétition (ex: "ligue1")
+    saison = scrapy.Field()             # Saison (ex: "2025-2026")
+    journee = scrapy.Field()            # Journée (estimée au premier crawl, voir Ligue1MatchesSpider)
+    journee_estimee = scrapy.Field()    # Journée estimée (True) ou observée au fil des crawls (False)
+    first_seen = scrapy.Field()         # Date de première observation du résultat (None si inconnue)
+    equipe_domicile = scrapy.Field()    # Équipe à domicile
+    equipe_exterieur = scrapy.Field()   # Équipe à l'extérieur
+    buts_domicile = scrapy.Field()      # Buts de l'équipe à domicile
+    buts_exterieur = scrapy.Field()     # Buts de l'équipe à l'extérieur
+    scraped_date = scrapy.Field()       # Date du scraping
@@ -0,0 +1,83 @@
+"""
+Métriques Prometheus des crawls
+
+Les métriques sont enregistrées dans un registre propre au processus : dans le
+scheduler, elles s'additionnent d'un crawl à l'autre.
+"""
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+import asyncio
+import functools
+import time
+
+REGISTRY = CollectorRegistry()
+
+# Signal envoyé par le spider après le parsing d'une page
+page_parsed = object()
+
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+CRAWL_RUNS = Counter(
+    'ligue1_crawl_runs_total', 'Crawls terminés, par raison de fin',
+    ['reason'], registry=REGISTRY
+)
+CRAWL_DURATION = Histogram(
+    'ligue1_crawl_duration_seconds', 'Durée totale d\'un crawl',
+    buckets=(1, 2.5, 5, 10, 30, 60, 120, 300, 600), registry=REGISTRY
+)
+LAST_CRAWL = Gauge(
+    'ligue1_crawl_last_finished_timestamp_seconds', 'Fin du dernier crawl (timestamp Unix)',
+    registry=REGISTRY
+)
+DOWNLOAD_LATENCY = Histogram(
+    'ligue1_download_latency_seconds', 'Latence de téléchargement des pages',
+    ['status'], registry=REGISTRY
+)
+PARSE_TIME = Histogram(
+    'ligue1_parse_seconds', 'Temps de parsing d\'une page de classement (Ligue1Spider.parse)',
+    ['ligue'], buckets=FAST_BUCKETS, registry=REGISTRY
+)
+ROWS_PARSED = Counter(
+    'ligue1_rows_parsed_total', 'Lignes de classement converties en items',
+    ['ligue'], registry=REGISTRY
+)
+ROWS_DROPPED = Counter(
+    'ligue1_rows_dropped_total', 'Lignes de classement ignorées par _parse_team_row',
+    ['ligue'], registry=REGISTRY
+)
+ITEMS = Counter(
+    'ligue1_items_total', 'Items en sortie de la chaîne de pipelines',
+    ['status'], registry=REGISTRY
+)
+PIPELINE_LATENCY = Histogram(
+    'ligue1_pipeline_process_item_seconds', 'Durée de process_item par pipeline',
+    ['pipeline'], buckets=FAST_BUCKETS, registry=REGISTRY
+)
+MONGO_WRITE_LATENCY = Histogram(
+    'ligue1_mongo_write_seconds', 'Durée des écritures MongoDB (bulk_write, version des données)',
+    ['collection'], buckets=FAST_BUCKETS, registry=REGISTRY
+)
+MONGO_WRITE_OPS = Counter(
+    'ligue1_mongo_write_operations_total', 'Opérations envoyées à MongoDB',
+    ['collection'], registry=REGISTRY
+)
+
+
+def timed_process_item(method):
+    """Mesure la durée de process_item (synchrone ou coroutine) du pipeline décoré"""
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(self, item, spider):
+            started = time.perf_counter()
+            try:
+                return await method(self, item, spider)
+            finally:
+                PIPELINE_LATENCY.labels(type(self).__name__).observe(time.perf_counter() - started)
+    else:
+        @functools.wraps(method)
+        def wrapper(self, item, spider):
+            started = time.perf_counter()
+            try:
+                return method(self, item, spider)
+            finally:
+                PIPELINE_LATENCY.labels(type(self).__name__).observe(time.perf_counter() - started)
+    return wrapper
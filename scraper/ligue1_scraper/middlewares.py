@@ -0,0 +1,126 @@
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import HtmlResponse
+import hashlib
+import json
+import os
+
+
+class ConditionalCacheMiddleware:
+    """Cache HTTP sur disque avec requêtes conditionnelles (ETag / Last-Modified)
+
+    Seules les requêtes marquées ``meta['conditional_cache']`` sont concernées. Une chaîne
+    sépare le cache d'une même URL entre spiders (ex: classement et résultats de la même page).
+    Une réponse 304 interrompt le traitement (aucun parsing, aucune écriture en base).
+    """
+
+    def __init__(self, cache_dir, offline=False, force_parse=False, stats=None):
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.force_parse = force_parse
+        self.stats = stats
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('HTTP_CONDITIONAL_CACHE_ENABLED', True):
+            raise NotConfigured
+        return cls(
+            cache_dir=settings.get('HTTP_CONDITIONAL_CACHE_DIR', 'data/http_cache'),
+            offline=settings.getbool('HTTP_CONDITIONAL_CACHE_OFFLINE', False),
+            force_parse=settings.getbool('HTTP_CONDITIONAL_CACHE_FORCE_PARSE', False),
+            stats=crawler.stats
+        )
+
+    def process_request(self, request, spider):
+        """Ajoute les en-têtes conditionnels, ou rejoue le cache en mode hors ligne"""
+        if not request.meta.get('conditional_cache'):
+            return None
+
+        meta = self._load_meta(request)
+
+        if self.offline:
+            if meta is None:
+                raise IgnoreRequest(f'Offline mode: no cached response for {request.url}')
+            self._inc('httpcache/offline_replay')
+            return self._cached_response(request, meta)
+
+        if meta:
+            if meta.get('etag'):
+                request.headers.setdefault('If-None-Match', meta['etag'])
+            if meta.get('last_modified'):
+                request.headers.setdefault('If-Modified-Since', meta['last_modified'])
+        return None
+
+    def process_response(self, request, response, spider):
+        """Stocke les réponses 200 et court-circuite les 304"""
+        if not request.meta.get('conditional_cache') or 'cached' in response.flags:
+            return response
+
+        if response.status == 304:
+            self._inc('httpcache/not_modified')
+            meta = self._load_meta(request)
+            if self.force_parse and meta:
+                return self._cached_response(request, meta)
+            spider.logger.info(f'Page inchangée (304), parsing ignoré: {request.url}')
+            raise IgnoreRequest(f'Not modified: {request.url}')
+
+        if response.status == 200:
+            self._store(request, response)
+            self._inc('httpcache/stored')
+
+        return response
+
+    def _paths(self, request):
+        namespace = request.meta.get('conditional_cache')
+        url = request.url if namespace is True else f'{namespace}:{request.url}'
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.html'
+
+    def _load_meta(self, request):
+        meta_path, body_path = self._paths(request)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _cached_response(self, request, meta):
+        _, body_path = self._paths(request)
+        with open(body_path, 'rb') as f:
+            body = f.read()
+        return HtmlResponse(
+            url=meta.get('url', request.url),
+            body=body,
+            encoding=meta.get('encoding', 'utf-8'),
+            request=request,
+            flags=['cached']
+        )
+
+    def _store(self, request, response):
+        meta_path, body_path = self._paths(request)
+        meta = {
+            'url': response.url,
+            'etag': _header(response, b'ETag'),
+            'last_modified': _header(response, b'Last-Modified'),
+            'encoding': getattr(response, 'encoding', 'utf-8'),
+        }
+        # Écriture atomique : le cache n'est jamais lu à moitié écrit
+        for path, data, mode in ((body_path, response.body, 'wb'),
+                                 (meta_path, json.dumps(meta), 'w')):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, mode) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    def _inc(self, key):
+        if self.stats:
+            self.stats.inc_value(key)
+
+
+def _header(response, name):
+    value = response.headers.get(name)
+    return value.decode('latin-1') if value else None
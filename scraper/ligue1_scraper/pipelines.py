@@ -1,71 +1,487 @@
 from itemadapter import ItemAdapter
-from pymongo import MongoClient
+from scrapy.utils.defer import deferred_from_coro
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from datetime import datetime
+import asyncio
+import hashlib
+import json
 import os
 import logging
+import time
+
+from ligue1_common.connection import create_async_client, create_client, get_async_client, get_client, pool_stats
+from ligue1_common.indexes import ensure_indexes, ensure_indexes_async
+from ligue1_scraper.metrics import MONGO_WRITE_LATENCY, MONGO_WRITE_OPS, timed_process_item
+
+
+# Champs ignorés pour détecter un changement de contenu
+HASH_IGNORED_FIELDS = ('_id', 'scraped_date')
+
+
+def content_hash(doc):
+    """Empreinte stable du contenu d'un document (hors _id et date de scraping)"""
+    content = {k: v for k, v in doc.items() if k not in HASH_IGNORED_FIELDS}
+    payload = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
 
 
 class MongoDBPipeline:
-    """Pipeline pour stocker les données dans MongoDB"""
+    """Pipeline pour stocker les données dans MongoDB
+
+    Les items de la saison en cours alimentent les collections "live" de leur compétition
+    (ex: ligue1_teams, ligue1_stats). Toutes les saisons, y compris les saisons passées
+    rattrapées en backfill, sont historisées dans standings_history.
+    """
     
-    collection_teams = 'ligue1_teams'
-    collection_stats = 'ligue1_stats'
+    collection_teams = '{ligue}_teams'
+    collection_stats = '{ligue}_stats'
+    collection_matches = '{ligue}_matches'
+    collection_history = 'standings_history'
+    collection_meta = 'ligue1_meta'
+    default_ligue = 'ligue1'
+    # État de préparation partagé par les crawls d'un même processus (voir setup_state)
+    warm_states = {}
 
-    def __init__(self, mongo_uri, mongo_db):
+    def __init__(self, mongo_uri, mongo_db, bulk_write=True, bulk_size=100, bulk_interval=5.0,
+                 unchanged_teams='touch', keep_connection=False):
         self.mongo_uri = mongo_uri
         self.mongo_db = mongo_db
+        self.keep_connection = keep_connection
         self.client = None
         self.db = None
+        
+        # Détection de changement : empreinte de la dernière version écrite par (collection, équipe)
+        self.unchanged_teams = unchanged_teams   # 'touch', 'skip' ou 'write'
+        self.team_hashes = {}
+        self.state = None
+        
+        # Mode écriture groupée (bulk_write)
+        self.bulk_write = bulk_write
+        self.bulk_size = bulk_size
+        self.bulk_interval = bulk_interval
+        self.pending = {}           # collection -> liste d'opérations
+        self.pending_count = 0
+        self.last_flush = time.monotonic()
+        
+        # Version des données "live", incrémentée quand le contenu affiché par le dashboard change
+        self.data_changed = False
 
     @classmethod
     def from_crawler(cls, crawler):
         return cls(
             mongo_uri=crawler.settings.get('MONGO_URI'),
-            mongo_db=crawler.settings.get('MONGO_DATABASE', 'ligue1_db')
+            mongo_db=crawler.settings.get('MONGO_DATABASE', 'ligue1_db'),
+            bulk_write=crawler.settings.getbool('MONGO_BULK_WRITE', True),
+            bulk_size=crawler.settings.getint('MONGO_BULK_SIZE', 100),
+            bulk_interval=crawler.settings.getfloat('MONGO_BULK_INTERVAL', 5.0),
+            unchanged_teams=crawler.settings.get('MONGO_UNCHANGED_TEAMS', 'touch'),
+            keep_connection=crawler.settings.getbool('MONGO_KEEP_CONNECTION', False)
         )
 
     def open_spider(self, spider):
         """Connexion à MongoDB au démarrage du spider"""
-        self.client = MongoClient(self.mongo_uri)
+        # Pool conservé entre les crawls (scheduler) ou propre à ce crawl
+        if self.keep_connection:
+            self.client = get_client(self.mongo_uri, appname='ligue1-spider')
+        else:
+            self.client = create_client(self.mongo_uri, appname='ligue1-spider')
         self.db = self.client[self.mongo_db]
         spider.logger.info(f'Connected to MongoDB: {self.mongo_db}')
+        
+        state = self.setup_state()
+        ligues = self.ligues_to_prepare(spider, state)
+        if ligues:
+            self.migrate_history(spider)
+            self.report_index_failures(ensure_indexes(self.db, ligues), spider)
+            state['prepared'].update(ligues)
+        for collection in self.hashes_to_load(spider, state):
+            self.load_team_hashes(collection, spider)
+
+    def setup_state(self):
+        """Préparation déjà faite (index, migration, empreintes des équipes)
+
+        Conservée d'un crawl à l'autre dans le processus si la connexion l'est (scheduler) :
+        les crawls suivants ne refont ni les index ni le chargement des empreintes.
+        """
+        fresh = {'prepared': set(), 'hashes_loaded': set(), 'team_hashes': {}}
+        if self.keep_connection:
+            state = self.warm_states.setdefault((self.mongo_uri, self.mongo_db, os.getpid()), fresh)
+        else:
+            state = fresh
+        self.state = state
+        self.team_hashes = state['team_hashes']
+        return state
+
+    def invalidate_state(self):
+        """Écriture en échec : index et empreintes seront revérifiés au prochain crawl"""
+        self.warm_states.pop((self.mongo_uri, self.mongo_db, os.getpid()), None)
+
+    def ligues_to_prepare(self, spider, state):
+        return [ligue for ligue in getattr(spider, 'ligues', [self.default_ligue])
+                if ligue not in state['prepared']]
+
+    def hashes_to_load(self, spider, state):
+        """Collections d'équipes dont les empreintes ne sont pas encore en mémoire"""
+        if self.unchanged_teams == 'write':
+            return []
+        collections = []
+        for ligue in getattr(spider, 'ligues', [self.default_ligue]):
+            collection = self.collection_teams.format(ligue=ligue)
+            if collection not in state['hashes_loaded']:
+                collections.append(collection)
+        return collections
+
+    def history_migration(self):
+        """Snapshots écrits avant l'ajout du champ ligue : (filtre, mise à jour)"""
+        return {'ligue': {'$exists': False}}, {'$set': {'ligue': self.default_ligue}}
+
+    @staticmethod
+    def data_version_update():
+        """Incrément de la version des données lue par le dashboard : (filtre, mise à jour)"""
+        return {'_id': 'data_version'}, {'$inc': {'version': 1}, '$set': {'updated_at': datetime.now()}}
+
+    @staticmethod
+    def report_index_failures(failed, spider):
+        if failed:
+            spider.logger.warning(f'Could not create indexes: {", ".join(failed)}')
+
+    def migrate_history(self, spider):
+        # Avant les index : les snapshots migrés participent au dédoublonnage de l'index unique
+        try:
+            self.db[self.collection_history].update_many(*self.history_migration())
+        except Exception as e:
+            spider.logger.warning(f'Could not migrate history snapshots: {e}')
+
+    def load_team_hashes(self, collection, spider):
+        """Charge une seule fois l'empreinte des équipes déjà en base"""
+        try:
+            self.store_team_hashes(collection, self.db[collection].find({}, {'_id': 0}))
+        except Exception as e:
+            spider.logger.warning(f'Could not load team hashes for {collection}, every team will be written: {e}')
+
+    def store_team_hashes(self, collection, docs):
+        for doc in docs:
+            if doc.get('equipe'):
+                self.team_hashes[(collection, doc['equipe'])] = content_hash(doc)
+        self.state['hashes_loaded'].add(collection)
+
+    def is_live(self, adapter, spider):
+        """Un item est "live" s'il concerne la saison en cours du spider"""
+        current = getattr(spider, 'saison', None)
+        return current is None or adapter.get('saison') == current
 
     def close_spider(self, spider):
-        """Fermeture de la connexion MongoDB"""
+        """Écriture des opérations en attente puis fermeture de la connexion MongoDB"""
+        self.flush(spider)
+        self.record_pool_stats(spider)
+        if self.keep_connection:
+            return
         self.client.close()
         spider.logger.info('MongoDB connection closed')
 
+    def record_pool_stats(self, spider):
+        """Statistiques du pool de connexions ajoutées aux stats Scrapy du crawl"""
+        for server in pool_stats.snapshot().values():
+            for name in ('open', 'created', 'checkouts', 'checkout_failures', 'wait_ms_max'):
+                spider.crawler.stats.max_value(f'mongodb/pool/{name}', server[name])
+
+    @timed_process_item
     def process_item(self, item, spider):
         """Traitement et insertion des items"""
+        self.route_item(self.prepare_item(item), spider)
+        return item
+
+    def prepare_item(self, item):
+        """Valeurs par défaut : date de scraping et compétition"""
         adapter = ItemAdapter(item)
         
         # Ajouter la date de scraping si non présente
         if 'scraped_date' not in adapter.field_names() or not adapter.get('scraped_date'):
             adapter['scraped_date'] = datetime.now()
         
-        # Détecter le type d'item et insérer dans la bonne collection
-        item_type = type(item).__name__
+        if not adapter.get('ligue'):
+            adapter['ligue'] = self.default_ligue
+        return adapter
+
+    def route_item(self, adapter, spider):
+        """Détecte le type d'item et prépare les écritures dans la bonne collection"""
+        item_type = type(adapter.item).__name__
+        live = self.is_live(adapter, spider)
         
         if 'Team' in item_type:
-            # Mise à jour ou insertion d'une équipe
-            self.db[self.collection_teams].update_one(
-                {'equipe': adapter.get('equipe')},
+            if live:
+                self.process_team(adapter, spider)
+            else:
+                self.write_history(dict(adapter), spider)
+            
+        elif 'Stats' in item_type and live:
+            # Une ligne de stats par (saison, journée), mise à jour à chaque scraping
+            self.write(self.collection_stats.format(ligue=adapter['ligue']), UpdateOne(
+                {'saison': adapter.get('saison'), 'journee': adapter.get('journee')},
                 {'$set': dict(adapter)},
                 upsert=True
-            )
-            spider.logger.info(f'Team saved: {adapter.get("equipe")}')
+            ), spider)
+            spider.logger.info(f'Stats saved for {adapter["ligue"]} season: {adapter.get("saison")}')
             
-        elif 'Stats' in item_type:
-            # Insertion des stats générales
-            self.db[self.collection_stats].insert_one(dict(adapter))
-            spider.logger.info(f'Stats saved for season: {adapter.get("saison")}')
+        elif 'Match' in item_type:
+            # Un document par match et par saison, toutes saisons confondues
+            self.write(self.collection_matches.format(ligue=adapter['ligue']), UpdateOne(
+                {
+                    'saison': adapter.get('saison'),
+                    'equipe_domicile': adapter.get('equipe_domicile'),
+                    'equipe_exterieur': adapter.get('equipe_exterieur')
+                },
+                # date : ancien nom de first_seen
+                {'$set': dict(adapter), '$unset': {'date': ''}},
+                upsert=True
+            ), spider)
+            if live:
+                self.data_changed = True
+
+    def process_team(self, adapter, spider):
+        """Upsert d'une équipe, ignoré ou réduit à la date de scraping si rien n'a changé"""
+        equipe = adapter.get('equipe')
+        collection = self.collection_teams.format(ligue=adapter['ligue'])
+        doc = dict(adapter)
+        new_hash = content_hash(doc)
+        
+        if self.unchanged_teams != 'write' and self.team_hashes.get((collection, equipe)) == new_hash:
+            spider.crawler.stats.inc_value('mongodb/teams_unchanged')
+            if self.unchanged_teams == 'touch':
+                self.write(collection, UpdateOne(
+                    {'equipe': equipe},
+                    {'$set': {'scraped_date': doc['scraped_date']}}
+                ), spider)
+            spider.logger.debug(f'Team unchanged: {equipe}')
+            return
         
+        # Mise à jour ou insertion d'une équipe
+        self.write(collection, UpdateOne(
+            {'equipe': equipe},
+            {'$set': doc},
+            upsert=True
+        ), spider)
+        self.team_hashes[(collection, equipe)] = new_hash
+        self.data_changed = True
+        spider.logger.info(f'Team saved: {equipe}')
+        
+        self.write_history(doc, spider)
+
+    def write_history(self, doc, spider):
+        """Snapshot historique : une ligne par journée jouée, jamais écrasée par une autre journée"""
+        self.write(self.collection_history, UpdateOne(
+            {
+                'ligue': doc.get('ligue'),
+                'saison': doc.get('saison'),
+                'journee': doc.get('matchs_joues'),
+                'equipe': doc.get('equipe')
+            },
+            {'$set': doc},
+            upsert=True
+        ), spider)
+
+    def write(self, collection, operation, spider):
+        """Ajoute une opération au buffer, ou l'exécute directement hors mode bulk"""
+        self.buffer(collection, operation)
+        if self.should_flush():
+            self.flush(spider)
+
+    def buffer(self, collection, operation):
+        self.pending.setdefault(collection, []).append(operation)
+        self.pending_count += 1
+
+    def should_flush(self):
+        return (not self.bulk_write
+                or self.pending_count >= self.bulk_size
+                or time.monotonic() - self.last_flush >= self.bulk_interval)
+
+    def take_pending(self):
+        """Vide le buffer et retourne les opérations en attente par collection"""
+        pending, self.pending = self.pending, {}
+        self.pending_count = 0
+        self.last_flush = time.monotonic()
+        return {collection: operations for collection, operations in pending.items() if operations}
+
+    def flush(self, spider):
+        """Envoie les opérations en attente via un bulk_write non ordonné par collection"""
+        for collection, operations in self.take_pending().items():
+            started = time.perf_counter()
+            try:
+                result = self.db[collection].bulk_write(operations, ordered=False)
+                self.log_bulk_result(collection, operations, result, spider)
+            except Exception as e:
+                self.log_bulk_error(collection, operations, e, spider)
+            finally:
+                self.observe_write(collection, len(operations), started)
+        
+        if self.data_changed:
+            self.bump_data_version(spider)
+
+    @staticmethod
+    def observe_write(collection, operations_count, started):
+        """Latence d'une écriture MongoDB (métriques du crawl)"""
+        MONGO_WRITE_LATENCY.labels(collection).observe(time.perf_counter() - started)
+        MONGO_WRITE_OPS.labels(collection).inc(operations_count)
+
+    def log_bulk_result(self, collection, operations, result, spider):
+        spider.logger.debug(
+            f'Bulk write {collection}: {len(operations)} ops, '
+            f'{result.inserted_count} inserted, {result.upserted_count} upserted, '
+            f'{result.modified_count} modified'
+        )
+
+    def log_bulk_error(self, collection, operations, error, spider):
+        # Les empreintes en mémoire ne reflètent plus forcément la base
+        self.invalidate_state()
+        if isinstance(error, BulkWriteError):
+            # En mode non ordonné, les opérations valides sont tout de même appliquées
+            errors = error.details.get('writeErrors', [])
+            spider.logger.error(
+                f'Bulk write {collection}: {len(errors)} erreur(s) sur {len(operations)} opérations'
+            )
+            for write_error in errors[:5]:
+                spider.logger.error(f"  op #{write_error.get('index')}: {write_error.get('errmsg')}")
+            spider.crawler.stats.inc_value('mongodb/bulk_write_errors', len(errors))
+        else:
+            spider.logger.error(f'Bulk write {collection} failed ({len(operations)} ops lost): {error}')
+            spider.crawler.stats.inc_value('mongodb/bulk_write_errors', len(operations))
+
+    def bump_data_version(self, spider):
+        """Signale au dashboard que les données ont changé (invalidation de son cache)"""
+        started = time.perf_counter()
+        try:
+            self.db[self.collection_meta].update_one(*self.data_version_update(), upsert=True)
+            self.data_changed = False
+        except Exception as e:
+            spider.logger.warning(f'Could not bump data version: {e}')
+        finally:
+            self.observe_write(self.collection_meta, 1, started)
+
+
+class AsyncMongoDBPipeline(MongoDBPipeline):
+    """Variante asynchrone (Motor) de MongoDBPipeline, pour le reactor asyncio
+
+    Les bulk_write partent en tâche de fond : téléchargement et parsing des pages suivantes
+    continuent pendant les écritures. Au-delà de MONGO_MAX_IN_FLIGHT écritures en cours,
+    process_item attend qu'une écriture se termine (contre-pression sur le flux d'items).
+    Le client Motor est lié à la boucle asyncio : avec MONGO_KEEP_CONNECTION (scheduler, une
+    seule boucle), il est partagé par tous les crawls du processus, sinon propre au crawl.
+    """
+
+    def __init__(self, *args, max_in_flight=4, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_in_flight = max_in_flight
+        self.in_flight = None
+        self.tasks = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        pipeline = super().from_crawler(crawler)
+        pipeline.max_in_flight = crawler.settings.getint('MONGO_MAX_IN_FLIGHT', 4)
+        return pipeline
+
+    def open_spider(self, spider):
+        return deferred_from_coro(self._open_spider(spider))
+
+    async def _open_spider(self, spider):
+        if self.keep_connection:
+            self.client = get_async_client(self.mongo_uri, appname='ligue1-spider')
+        else:
+            self.client = create_async_client(self.mongo_uri, appname='ligue1-spider')
+        self.db = self.client[self.mongo_db]
+        self.in_flight = asyncio.Semaphore(self.max_in_flight)
+        spider.logger.info(f'Connected to MongoDB (async): {self.mongo_db}')
+        
+        state = self.setup_state()
+        ligues = self.ligues_to_prepare(spider, state)
+        if ligues:
+            try:
+                await self.db[self.collection_history].update_many(*self.history_migration())
+            except Exception as e:
+                spider.logger.warning(f'Could not migrate history snapshots: {e}')
+            self.report_index_failures(await ensure_indexes_async(self.db, ligues), spider)
+            state['prepared'].update(ligues)
+        for collection in self.hashes_to_load(spider, state):
+            try:
+                self.store_team_hashes(collection, await self.db[collection].find({}, {'_id': 0}).to_list(None))
+            except Exception as e:
+                spider.logger.warning(f'Could not load team hashes for {collection}, every team will be written: {e}')
+
+    @timed_process_item
+    async def process_item(self, item, spider):
+        """Prépare les écritures de l'item ; n'attend Mongo que si trop d'écritures sont en cours"""
+        self.route_item(self.prepare_item(item), spider)
+        if self.should_flush():
+            await self.flush_async(spider)
         return item
 
+    def write(self, collection, operation, spider):
+        # Envoi différé : flush_async est appelé depuis process_item
+        self.buffer(collection, operation)
+
+    async def flush_async(self, spider):
+        """Lance un bulk_write en tâche de fond par collection en attente"""
+        batches = []
+        for collection, operations in self.take_pending().items():
+            await self.in_flight.acquire()
+            batches.append(self._track(self._bulk_write(collection, operations, spider)))
+        
+        if self.data_changed:
+            self.data_changed = False
+            self._track(self._bump_data_version_after(batches, spider))
+
+    def _track(self, coro):
+        task = asyncio.ensure_future(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def _bulk_write(self, collection, operations, spider):
+        started = time.perf_counter()
+        try:
+            result = await self.db[collection].bulk_write(operations, ordered=False)
+            self.log_bulk_result(collection, operations, result, spider)
+        except Exception as e:
+            self.log_bulk_error(collection, operations, e, spider)
+        finally:
+            self.observe_write(collection, len(operations), started)
+            self.in_flight.release()
+
+    async def _bump_data_version_after(self, batches, spider):
+        """Version incrémentée une fois les écritures du lot terminées (le dashboard relit tout)"""
+        await asyncio.gather(*batches)
+        started = time.perf_counter()
+        try:
+            await self.db[self.collection_meta].update_one(*self.data_version_update(), upsert=True)
+        except Exception as e:
+            self.data_changed = True     # Réessayé au prochain flush
+            spider.logger.warning(f'Could not bump data version: {e}')
+        finally:
+            self.observe_write(self.collection_meta, 1, started)
+
+    def close_spider(self, spider):
+        return deferred_from_coro(self._close_spider(spider))
+
+    async def _close_spider(self, spider):
+        await self.flush_async(spider)
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks))
+        # Dernière chance pour une version restée en échec
+        if self.data_changed:
+            self.data_changed = False
+            await self._bump_data_version_after([], spider)
+        self.record_pool_stats(spider)
+        if self.keep_connection:
+            return
+        self.client.close()
+        spider.logger.info('MongoDB connection closed')
+
 
 class DataCleaningPipeline:
     """Pipeline pour nettoyer et valider les données"""
     
+    @timed_process_item
     def process_item(self, item, spider):
         adapter = ItemAdapter(item)
         
@@ -78,7 +494,8 @@ class DataCleaningPipeline:
         # Convertir les champs numériques
         numeric_fields = ['position', 'points', 'matchs_joues', 'victoires', 
                          'nuls', 'defaites', 'buts_pour', 'buts_contre', 
-                         'difference', 'total_equipes', 'total_matchs']
+                         'difference', 'total_equipes', 'total_matchs',
+                         'buts_domicile', 'buts_exterieur']
         
         for field in numeric_fields:
             if field in adapter.field_names():
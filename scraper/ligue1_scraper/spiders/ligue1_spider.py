@@ -1,114 +1,300 @@
 import scrapy
 from ligue1_scraper.items import Ligue1TeamItem, Ligue1StatsItem
+from ligue1_scraper.metrics import page_parsed
 from datetime import datetime
+import json
+import os
 import re
+import time
+
+
+# Compétitions disponibles : modèle d'URL Wikipedia de la page de saison
+COMPETITIONS = {
+    'ligue1': {
+        'url': 'https://fr.wikipedia.org/wiki/Championnat_de_France_de_football_{saison}',
+    },
+    'ligue2': {
+        'url': 'https://fr.wikipedia.org/wiki/Championnat_de_France_de_football_de_Ligue_2_{saison}',
+    },
+    'premier_league': {
+        'url': 'https://fr.wikipedia.org/wiki/Championnat_d%27Angleterre_de_football_{saison}',
+    },
+    'liga': {
+        'url': 'https://fr.wikipedia.org/wiki/Championnat_d%27Espagne_de_football_{saison}',
+    },
+    'serie_a': {
+        'url': 'https://fr.wikipedia.org/wiki/Championnat_d%27Italie_de_football_{saison}',
+    },
+    'bundesliga': {
+        'url': 'https://fr.wikipedia.org/wiki/Championnat_d%27Allemagne_de_football_{saison}',
+    },
+}
+
+
+# Libellés d'en-tête reconnus -> champ de Ligue1TeamItem (les tableaux historiques varient : G/P ou V/D...)
+COLUMN_ALIASES = {
+    'rang': 'position', 'pos': 'position', 'pos.': 'position', '#': 'position', 'cl.': 'position',
+    'équipe': 'equipe', 'equipe': 'equipe', 'club': 'equipe', 'clubs': 'equipe',
+    'pts': 'points', 'points': 'points',
+    'j': 'matchs_joues', 'mj': 'matchs_joues', 'm': 'matchs_joues',
+    'v': 'victoires', 'g': 'victoires',
+    'n': 'nuls',
+    'd': 'defaites', 'p': 'defaites',
+    'bp': 'buts_pour',
+    'bc': 'buts_contre',
+    'diff': 'difference', 'dif': 'difference', 'diff.': 'difference', '+/-': 'difference', 'db': 'difference',
+}
+NUMERIC_FIELDS = ('position', 'points', 'matchs_joues', 'victoires', 'nuls', 'defaites',
+                  'buts_pour', 'buts_contre', 'difference')
+# Ordre historique des colonnes, utilisé si l'en-tête n'est pas reconnu
+DEFAULT_COLUMNS = {field: index for index, field in enumerate(
+    ('position', 'equipe') + NUMERIC_FIELDS[1:])}
+
+# En-têtes de colonnes caractéristiques d'un tableau de classement (Pts, J, V/G, N, D/P, Bp, Bc, Diff)
+HEADER_SIGNALS = frozenset(token for token, field in COLUMN_ALIASES.items()
+                           if field not in ('position', 'equipe'))
+MIN_HEADER_SIGNALS = 5
+
+# Candidats, par ordre de priorité, et ligne d'en-tête de chaque tableau
+TABLE_XPATHS = ('//table[contains(@class, "wikitable")]', '//table[not(contains(@class, "wikitable"))]')
+HEADER_CELLS_XPATH = '(.//tr[th])[1]/th'
+ROW_CELLS_XPATH = './th|./td'
+FOOTNOTE_RE = re.compile(r'\[[^\]]*\]')
+INT_RE = re.compile(r'[-+]?\d+')
+MINUS_SIGNS = str.maketrans({'−': '-', '–': '-'})
+# Premier lien avec du texte : les liens des drapeaux et logos (image seule) sont ignorés
+TEAM_LINK_XPATH = './/a[normalize-space()]'
+
+
+def team_name(cell):
+    """Nom d'une équipe (cellule lxml) : texte du premier lien non vide, sinon de la cellule, sans notes"""
+    links = cell.xpath(TEAM_LINK_XPATH)
+    name = links[0].text_content() if links else cell.text_content()
+    return FOOTNOTE_RE.sub('', name).strip()
+
+
+def parse_seasons(value):
+    """Convertit "2025-2026", "1995:2025" ou une liste séparée par des virgules en saisons"""
+    seasons = []
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if ':' in part:
+            # Plage d'années de début de saison, bornes incluses
+            first, last = (int(year) for year in part.split(':'))
+            seasons.extend(f'{year}-{year + 1}' for year in range(first, last + 1))
+        elif re.fullmatch(r'\d{4}', part):
+            seasons.append(f'{part}-{int(part) + 1}')
+        else:
+            seasons.append(part)
+    return seasons
 
 
 class Ligue1Spider(scrapy.Spider):
-    """Spider pour scraper le classement de la Ligue 1 depuis Wikipedia"""
+    """Spider pour scraper le classement de la Ligue 1 (et d'autres championnats) depuis Wikipedia
+
+    Arguments (optionnels) :
+        saisons : "2025-2026", plage "1995:2025" ou liste "2023-2024,2024-2025"
+        ligues  : liste de compétitions, ex. "ligue1,ligue2" (voir COMPETITIONS)
+
+    Exemple :
+        scrapy crawl ligue1 -a saisons=1995:2025 -a ligues=ligue1,ligue2
+    """
     
     name = "ligue1"
     allowed_domains = ["fr.wikipedia.org"]
-    start_urls = ["https://fr.wikipedia.org/wiki/Championnat_de_France_de_football_2025-2026"]
+    saison = "2025-2026"        # Saison en cours (écrite dans les collections "live")
+    
+    def __init__(self, saisons=None, ligues='ligue1', *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fingerprints = None        # Empreinte du tableau de classement par compétition et saison
+        self.fingerprints_changed = False
+        self.saisons = parse_seasons(saisons) if saisons else [self.saison]
+        self.ligues = [ligue.strip() for ligue in ligues.split(',') if ligue.strip()]
+        
+        unknown = [ligue for ligue in self.ligues if ligue not in COMPETITIONS]
+        if unknown:
+            raise ValueError(f'Compétitions inconnues: {", ".join(unknown)} (disponibles: {", ".join(COMPETITIONS)})')
+    
+    def start_requests(self):
+        # Toutes les pages sont planifiées d'un coup : Scrapy les télécharge en parallèle
+        for ligue in self.ligues:
+            for saison in self.saisons:
+                url = COMPETITIONS[ligue]['url'].format(saison=saison)
+                # Requête conditionnelle : une page inchangée (304) n'est pas reparsée
+                yield scrapy.Request(
+                    url,
+                    callback=self.parse,
+                    meta={'conditional_cache': True},
+                    cb_kwargs={'ligue': ligue, 'saison': saison}
+                )
     
-    def parse(self, response):
-        self.logger.info(f'Scraping: {response.url}')
+    def parse(self, response, ligue='ligue1', saison=None):
+        saison = saison or self.saison
+        self.logger.info(f'Scraping {ligue} {saison}: {response.url}')
+        started = time.perf_counter()
         
         # Trouver le tableau de classement
-        table = self._find_ranking_table(response)
+        table = self._find_ranking_table(response, ligue, saison)
         if not table:
-            self.logger.error('Tableau de classement introuvable')
+            self.logger.error(f'Tableau de classement introuvable ({ligue} {saison})')
             return
         
-        # Parser les données
-        teams_count = 0
+        # Correspondance colonnes -> champs, calculée une seule fois par tableau
+        columns = self._column_map(self._header_tokens(table))
+        scraped_at = datetime.now()
+        
+        # Parser les données (les items sont émis après coup : le temps de parsing exclut les pipelines)
+        items = []
+        dropped = 0
         journee = 0
         
-        for row in table.css('tr')[1:]:  # Skip header
-            team_data = self._parse_team_row(row)
+        for row in table.root.xpath('.//tr[td]'):  # Lignes de données uniquement
+            team_data = self._parse_team_row(row, columns, scraped_at)
             if not team_data:
+                dropped += 1
                 continue
             
             if journee == 0:
                 journee = team_data['matchs_joues']
             
-            yield Ligue1TeamItem(**team_data)
-            teams_count += 1
-            self.logger.info(f"{team_data['position']}. {team_data['equipe']} - {team_data['points']} pts")
+            items.append(Ligue1TeamItem(ligue=ligue, saison=saison, **team_data))
+            self.logger.debug(f"{team_data['position']}. {team_data['equipe']} - {team_data['points']} pts")
+        
+        teams_count = len(items)
         
-        # Stats globales
-        yield Ligue1StatsItem(
-            saison="2025-2026",
+        # Stats globales (chaque match compte pour deux équipes)
+        items.append(Ligue1StatsItem(
+            ligue=ligue,
+            saison=saison,
             journee=journee,
             total_equipes=teams_count,
-            total_matchs=0,
-            scraped_date=datetime.now()
-        )
+            total_matchs=sum(item['matchs_joues'] for item in items) // 2,
+            scraped_date=scraped_at
+        ))
         
-        self.logger.info(f'✅ {teams_count} équipes scrapées')
+        self._page_parsed(ligue, time.perf_counter() - started, teams_count, dropped)
+        self.logger.info(f'✅ {teams_count} équipes scrapées ({ligue} {saison})')
+        yield from items
     
-    def _find_ranking_table(self, response):
-        """Trouve le tableau de classement dans la page"""
-        # Essayer différents sélecteurs
-        for selector in ['table.wikitable', 'table']:
-            tables = response.css(selector)
-            if not tables:
-                continue
+    def _page_parsed(self, ligue, seconds, rows, dropped):
+        """Publie le temps de parsing et les lignes ignorées (extension CrawlMetrics)"""
+        crawler = getattr(self, 'crawler', None)
+        if crawler is None:
+            return
+        crawler.stats.inc_value('parse/rows_dropped', dropped)
+        crawler.signals.send_catch_log(
+            page_parsed, spider=self, ligue=ligue, seconds=seconds, rows=rows, dropped=dropped
+        )
+    
+    def closed(self, reason):
+        self._save_fingerprints()
+    
+    def _find_ranking_table(self, response, ligue='ligue1', saison=None):
+        """Trouve le tableau de classement dans la page à partir de sa ligne d'en-tête"""
+        fingerprints = self._load_fingerprints()
+        # Une empreinte par page : la position du tableau varie d'une saison à l'autre
+        key = f'{ligue}/{saison or self.saison}'
+        known = fingerprints.get(key)
+        
+        # Essayer d'abord le tableau retenu lors des exécutions précédentes
+        if known:
+            xpath = TABLE_XPATHS[known['group']]
+            table = response.xpath(f"({xpath})[{known['index'] + 1}]")
+            if table:
+                headers = self._header_tokens(table[0])
+                if list(headers) == known.get('headers') and self._is_ranking_header(headers):
+                    return table[0]
+        
+        for group, xpath in enumerate(TABLE_XPATHS):
+            tables = response.xpath(xpath)
             
-            # Chercher le bon tableau
-            for table in tables:
-                text = ' '.join(table.css('::text').getall())
-                # Le tableau doit contenir "Pts" et au moins une équipe connue
-                if 'Pts' in text and any(team in text for team in ['Paris Saint-Germain', 'Lens', 'Monaco']):
+            # Sinon, premier tableau dont l'en-tête ressemble à un classement
+            for index, table in enumerate(tables):
+                headers = self._header_tokens(table)
+                if self._is_ranking_header(headers):
+                    fingerprints[key] = {'group': group, 'index': index, 'headers': list(headers)}
+                    self.fingerprints_changed = True
                     return table
         
         return None
     
-    def _parse_team_row(self, row):
-        """Parse une ligne du tableau pour extraire les données d'une équipe"""
-        cells = row.css('td')
+    @staticmethod
+    def _is_ranking_header(headers):
+        return 'pts' in headers and len(HEADER_SIGNALS.intersection(headers)) >= MIN_HEADER_SIGNALS
+    
+    @staticmethod
+    def _header_tokens(table):
+        """Libellés normalisés (minuscules, sans notes) de la première ligne d'en-tête"""
+        return tuple(
+            FOOTNOTE_RE.sub('', cell.xpath('normalize-space(.)').get('')).strip().lower()
+            for cell in table.xpath(HEADER_CELLS_XPATH)
+        )
+    
+    def _fingerprints_path(self):
+        settings = getattr(self, 'settings', None)
+        default = 'data/table_fingerprints.json'
+        return settings.get('TABLE_FINGERPRINTS_FILE', default) if settings else default
+    
+    def _load_fingerprints(self):
+        if self.fingerprints is None:
+            try:
+                with open(self._fingerprints_path(), encoding='utf-8') as f:
+                    self.fingerprints = json.load(f)
+            except (OSError, ValueError):
+                self.fingerprints = {}
+        return self.fingerprints
+    
+    def _save_fingerprints(self):
+        if not self.fingerprints_changed:
+            return
+        path = self._fingerprints_path()
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.fingerprints, f, ensure_ascii=False, indent=2)
+            self.fingerprints_changed = False
+        except OSError as e:
+            self.logger.warning(f'Could not save table fingerprints: {e}')
+    
+    def _column_map(self, headers):
+        """Index de chaque champ dans la ligne, d'après les libellés d'en-tête"""
+        columns = {}
+        for index, token in enumerate(headers):
+            field = COLUMN_ALIASES.get(token)
+            if field and field not in columns:
+                columns[field] = index
         
-        if len(cells) < 8:
+        if len(columns) < len(DEFAULT_COLUMNS):
+            missing = sorted(set(DEFAULT_COLUMNS) - set(columns))
+            self.logger.warning(f'En-tête non reconnu (colonnes manquantes: {missing}), ordre par défaut utilisé')
+            return DEFAULT_COLUMNS
+        return columns
+    
+    def _parse_team_row(self, row, columns, scraped_at):
+        """Parse une ligne du tableau (élément lxml) pour extraire les données d'une équipe"""
+        cells = row.xpath(ROW_CELLS_XPATH)
+        if len(cells) <= max(columns.values()):
             return None
         
         try:
-            # Position
-            pos_text = cells[0].css('::text').get()
-            if not pos_text:
-                return None
-            position = int(re.search(r'\d+', pos_text).group())
-            
-            # Nom de l'équipe
-            equipe = (cells[1].css('a::text').get() or 
-                     cells[1].css('::text').get() or
-                     cells[2].css('a::text').get() or 
-                     cells[2].css('::text').get() or "Unknown").strip()
-            
-            # Extraction des nombres (Pts, J, V, N, D, BP, BC, Diff)
-            numbers = []
-            for cell in cells[2:]:
-                text = cell.css('::text').get(default='').strip()
-                match = re.search(r'-?\d+', text)
-                if match:
-                    numbers.append(int(match.group()))
+            team_data = {}
+            for field in NUMERIC_FIELDS:
+                text = cells[columns[field]].text_content().translate(MINUS_SIGNS)
+                match = INT_RE.search(FOOTNOTE_RE.sub('', text))
+                if not match:
+                    return None
+                team_data[field] = int(match.group())
             
-            if len(numbers) < 8:
+            # Sans nom, l'équipe serait fusionnée avec les autres lignes sans nom (upsert sur equipe)
+            team_data['equipe'] = team_name(cells[columns['equipe']])
+            if not team_data['equipe']:
                 return None
             
-            return {
-                'position': position,
-                'equipe': equipe,
-                'points': numbers[0],
-                'matchs_joues': numbers[1],
-                'victoires': numbers[2],
-                'nuls': numbers[3],
-                'defaites': numbers[4],
-                'buts_pour': numbers[5],
-                'buts_contre': numbers[6],
-                'difference': numbers[7],
-                'forme': "",
-                'scraped_date': datetime.now()
-            }
+            team_data['forme'] = ""
+            team_data['scraped_date'] = scraped_at
+            return team_data
             
         except Exception as e:
             self.logger.debug(f'Erreur parsing ligne: {e}')
@@ -0,0 +1,242 @@
+import scrapy
+from ligue1_scraper.items import Ligue1MatchItem
+from ligue1_scraper.pipelines import MongoDBPipeline
+from ligue1_scraper.spiders.ligue1_spider import (
+    COMPETITIONS, FOOTNOTE_RE, MINUS_SIGNS, ROW_CELLS_XPATH, TABLE_XPATHS, parse_seasons, team_name
+)
+from ligue1_common.connection import get_client
+from pymongo.errors import PyMongoError
+from collections import Counter
+from datetime import datetime
+import re
+
+
+SCORE_RE = re.compile(r'^\s*(\d+)\s*-\s*(\d+)\s*$')
+MIN_GRID_TEAMS = 4
+
+
+def round_robin(teams):
+    """Matchs aller d'un championnat complet (méthode du cercle) : {paire: tour}, tours 1..n-1 (n pair)"""
+    order = sorted(teams)
+    if len(order) % 2:
+        order.append(None)          # Exempt
+    n = len(order)
+    rounds = {}
+    for r in range(1, n):
+        for i in range(n // 2):
+            home, away = order[i], order[n - 1 - i]
+            if home is not None and away is not None:
+                rounds[frozenset((home, away))] = r
+        order = [order[0], order[-1]] + order[1:-1]
+    return rounds
+
+
+def estimate_journees(pairs, fixed=None):
+    """Journée estimée de chaque match (domicile, extérieur) de ``pairs``
+
+    La grille ne dit pas quand un match a été joué. Les matchs aller (un par paire, dans
+    l'ordre des tours du calendrier de référence round_robin), puis les matchs retour, sont
+    placés à la première journée où aucune des deux équipes ne joue déjà (``fixed`` : journées
+    connues), un match retour après son match aller. Chaque équipe joue ainsi au plus une
+    fois par journée et, pour une saison en cours, le nombre de journées reste proche du
+    nombre de matchs joués. Si ce placement dépasse la durée d'une saison, le calendrier
+    de référence est utilisé tel quel (aller aux tours 1..t, retour aux tours t+1..2t).
+    """
+    pairs = list(pairs)
+    fixed = fixed or {}
+    teams = {team for pair in pairs + list(fixed) for team in pair}
+    template = round_robin(teams)
+    half = max(template.values(), default=0)
+
+    placed = set(pairs)
+    first_legs, return_legs = [], []
+    for pair in pairs:
+        reverse = pair[::-1]
+        # Sens du match aller inconnu quand les deux sont à placer : ordre alphabétique
+        if reverse in placed and pair > reverse:
+            return_legs.append(pair)
+        else:
+            first_legs.append(pair)
+    first_legs.sort(key=lambda pair: (template[frozenset(pair)], pair))
+    return_legs.sort(key=lambda pair: (template[frozenset(pair)], pair))
+
+    busy = {team: set() for team in teams}
+    for (home, away), journee in fixed.items():
+        busy[home].add(journee)
+        busy[away].add(journee)
+    journees = {}
+    for pair in first_legs + return_legs:
+        home, away = pair
+        first_leg = journees.get(pair[::-1], fixed.get(pair[::-1], 0))
+        journee = first_leg + 1
+        while journee in busy[home] or journee in busy[away]:
+            journee += 1
+        journees[pair] = journee
+        busy[home].add(journee)
+        busy[away].add(journee)
+
+    if max(journees.values(), default=0) > 2 * half:
+        journees = {pair: template[frozenset(pair)] + (half if pair in return_legs else 0) for pair in pairs}
+    return journees
+
+
+class Ligue1MatchesSpider(scrapy.Spider):
+    """Spider des résultats match par match, depuis la grille des résultats de la saison
+
+    La grille (domicile en lignes, extérieur en colonnes) ne donne ni la date ni la journée.
+    Le crawl étant incrémental, un résultat absent de la base est un match joué depuis le
+    crawl précédent : sa journée est déduite du nombre de matchs joués par les deux équipes
+    et ``first_seen`` est la date de sa première observation (pas la date du match). Au
+    premier crawl d'une saison (aucun match en base, saisons passées comprises), la journée
+    est estimée par estimate_journees et marquée ``journee_estimee`` : le classement calculé
+    la traite comme inconnue ; ``first_seen`` reste None. Les matchs déjà en base sans
+    journée la reçoivent au crawl suivant.
+
+    Incrémental :
+        - une saison passée complète en base (n × (n-1) matchs) n'est pas téléchargée ;
+        - seuls les matchs absents de la base ou dont le score a changé sont émis.
+
+    Exemple :
+        scrapy crawl ligue1_matches -a saisons=2020:2025 -a ligues=ligue1
+    """
+
+    name = "ligue1_matches"
+    allowed_domains = ["fr.wikipedia.org"]
+    saison = "2025-2026"        # Saison en cours
+
+    def __init__(self, saisons=None, ligues='ligue1', *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.saisons = parse_seasons(saisons) if saisons else [self.saison]
+        self.ligues = [ligue.strip() for ligue in ligues.split(',') if ligue.strip()]
+        self.stored = {}            # (ligue, saison) -> {(domicile, extérieur): match en base}
+
+        unknown = [ligue for ligue in self.ligues if ligue not in COMPETITIONS]
+        if unknown:
+            raise ValueError(f'Compétitions inconnues: {", ".join(unknown)} (disponibles: {", ".join(COMPETITIONS)})')
+
+    def start_requests(self):
+        for ligue in self.ligues:
+            for saison in self.saisons:
+                stored = self.stored[(ligue, saison)] = self._load_stored_matches(ligue, saison)
+                if saison != self.saison and self._season_complete(stored):
+                    self.logger.info(f'Saison complète en base, ignorée ({ligue} {saison})')
+                    continue
+
+                url = COMPETITIONS[ligue]['url'].format(saison=saison)
+                # Cache conditionnel séparé de celui du classement (même URL)
+                yield scrapy.Request(
+                    url,
+                    callback=self.parse,
+                    meta={'conditional_cache': self.name},
+                    cb_kwargs={'ligue': ligue, 'saison': saison}
+                )
+
+    def parse(self, response, ligue='ligue1', saison=None):
+        saison = saison or self.saison
+        grid = self._find_results_grid(response)
+        if grid is None:
+            self.logger.warning(f'Grille des résultats introuvable ou vide ({ligue} {saison})')
+            return
+
+        stored = self.stored.get((ligue, saison), {})
+        played = Counter()
+        for home, away, _, _ in grid:
+            played[home] += 1
+            played[away] += 1
+
+        # Journées estimées pour les matchs sans journée connue (premier crawl, anciennes lignes)
+        fixed = {pair: doc['journee'] for pair, doc in stored.items() if doc.get('journee')}
+        unknown = [(home, away) for home, away, _, _ in grid
+                   if (home, away) not in fixed and ((home, away) in stored or not stored)]
+        estimated = estimate_journees(unknown, fixed) if unknown else {}
+
+        now = datetime.now()
+        new_count = updated_count = 0
+        for home, away, home_goals, away_goals in grid:
+            known = stored.get((home, away))
+            if known is None:
+                # Journée et première observation fiables seulement pour un match apparu depuis le dernier crawl
+                if stored:
+                    journee, journee_estimee, first_seen = max(played[home], played[away]), False, now
+                else:
+                    journee, journee_estimee, first_seen = estimated[(home, away)], True, None
+                new_count += 1
+            elif ((known.get('buts_domicile'), known.get('buts_exterieur')) != (home_goals, away_goals)
+                  or not known.get('journee') or 'journee_estimee' not in known):
+                journee, journee_estimee, first_seen = self._stored_journee(known)
+                if not journee:
+                    journee, journee_estimee = estimated[(home, away)], True
+                updated_count += 1
+            else:
+                continue
+
+            yield Ligue1MatchItem(
+                ligue=ligue,
+                saison=saison,
+                journee=journee,
+                journee_estimee=journee_estimee,
+                first_seen=first_seen,
+                equipe_domicile=home,
+                equipe_exterieur=away,
+                buts_domicile=home_goals,
+                buts_exterieur=away_goals,
+                scraped_date=now
+            )
+
+        self.logger.info(f'✅ {len(grid)} matchs joués, {new_count} nouveaux, {updated_count} corrigés, '
+                         f'{len(estimated)} journées estimées ({ligue} {saison})')
+
+    def _load_stored_matches(self, ligue, saison):
+        """Matchs déjà en base pour une saison : {(domicile, extérieur): document}"""
+        collection = MongoDBPipeline.collection_matches.format(ligue=ligue)
+        try:
+            db = get_client(self.settings.get('MONGO_URI'))[self.settings.get('MONGO_DATABASE', 'ligue1_db')]
+            cursor = db[collection].find({'saison': saison}, {'_id': 0, 'scraped_date': 0})
+            return {(doc['equipe_domicile'], doc['equipe_exterieur']): doc for doc in cursor}
+        except PyMongoError as e:
+            self.logger.warning(f'Could not load stored matches ({ligue} {saison}), full crawl: {e}')
+            return {}
+
+    @staticmethod
+    def _stored_journee(known):
+        """(journée, estimée ?, première observation) d'un match en base
+
+        Les lignes antérieures au champ journee_estimee portent la première observation dans
+        ``date`` ; une journée sans première observation y a été estimée au premier crawl.
+        """
+        first_seen = known.get('first_seen') or known.get('date')
+        journee = known.get('journee')
+        journee_estimee = known.get('journee_estimee')
+        if journee_estimee is None:
+            journee_estimee = bool(journee) and first_seen is None
+        return journee, journee_estimee, first_seen
+
+    @staticmethod
+    def _season_complete(stored):
+        teams = {team for pair in stored for team in pair}
+        return len(teams) >= MIN_GRID_TEAMS and len(stored) == len(teams) * (len(teams) - 1)
+
+    def _find_results_grid(self, response):
+        """Matchs joués de la première grille carrée (n équipes, n adversaires) contenant des scores"""
+        for xpath in TABLE_XPATHS:
+            for table in response.xpath(xpath):
+                rows = [row.xpath(ROW_CELLS_XPATH) for row in table.root.xpath('.//tr[td]')]
+                n = len(rows)
+                if n < MIN_GRID_TEAMS or any(len(cells) != n + 1 for cells in rows):
+                    continue
+
+                teams = [team_name(cells[0]) for cells in rows]
+                if not all(teams):
+                    continue
+                matches = []
+                for i, cells in enumerate(rows):
+                    for j, cell in enumerate(cells[1:]):
+                        if i == j:
+                            continue
+                        text = FOOTNOTE_RE.sub('', cell.text_content()).translate(MINUS_SIGNS)
+                        score = SCORE_RE.match(text)
+                        if score:
+                            matches.append((teams[i], teams[j], int(score.group(1)), int(score.group(2))))
+                if matches:
+                    return matches
+        return None
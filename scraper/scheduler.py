@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
 """
-Scheduler pour lancer le spider Ligue 1 périodiquement
+Scheduler pour lancer les spiders Ligue 1 (classement puis résultats) périodiquement,
+puis la simulation de fin de saison quand le classement a changé
+
+Les crawls sont lancés dans le processus via CrawlerRunner : le reactor Twisted
+et le pool de connexions MongoDB restent ouverts d'une exécution à l'autre.
 """
 import schedule
 import time
-import subprocess
 import logging
 import sys
 import argparse
-from datetime import datetime
+
+from scrapy.utils.project import get_project_settings
+from scrapy.utils.reactor import install_reactor
+from ligue1_common.connection import close_clients, get_client, pool_stats
+from ligue1_common.simulation import simulate_if_changed
 
 # Configuration du logging
 logging.basicConfig(
@@ -20,28 +27,110 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Durée maximale d'un crawl (secondes)
+CRAWL_TIMEOUT = 300
 
-def run_spider():
-    """Lance le spider Ligue 1"""
-    logger.info('🕷️  Starting Ligue 1 spider...')
-    try:
-        result = subprocess.run(
-            ['scrapy', 'crawl', 'ligue1'],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minutes max
+
+class SpiderRunner:
+    """Lance les crawls dans le reactor courant, sans exécutions simultanées"""
+
+    def __init__(self, settings, spider_names=('ligue1', 'ligue1_matches')):
+        from scrapy.crawler import CrawlerRunner
+
+        self.spider_names = spider_names
+        self.settings = settings
+        # Pool MongoDB conservé entre les crawls, timeout géré par Scrapy
+        self.settings.set('MONGO_KEEP_CONNECTION', True)
+        self.settings.set('CLOSESPIDER_TIMEOUT', CRAWL_TIMEOUT)
+        self.runner = CrawlerRunner(self.settings)
+        self.running = False
+
+    def run_spider(self):
+        """Lance les spiders l'un après l'autre (ignoré si un crawl est déjà en cours)"""
+        from twisted.internet import defer
+
+        if self.running:
+            logger.warning('⏭️  Previous crawl still running, skipping this run')
+            return None
+
+        self.running = True
+        deferred = defer.succeed(None)
+        for spider_name in self.spider_names:
+            deferred.addCallback(lambda _, name=spider_name: self._crawl(name))
+        if self.settings.getbool('SIMULATION_ENABLED'):
+            deferred.addCallback(lambda _: self._simulate())
+        deferred.addBoth(self._on_finish)
+        return deferred
+
+    def _crawl(self, spider_name):
+        """Un crawl ; une erreur est journalisée sans empêcher le spider suivant"""
+        logger.info(f'🕷️  Starting {spider_name} spider...')
+        started = time.monotonic()
+
+        try:
+            crawler = self.runner.create_crawler(spider_name)
+            deferred = self.runner.crawl(crawler)
+        except Exception as e:
+            logger.error(f'❌ Error running spider {spider_name}: {e}')
+            return None
+
+        deferred.addCallback(self._on_success, crawler, started)
+        deferred.addErrback(self._on_error, started)
+        return deferred
+
+    def _simulate(self):
+        """Simulation de fin de saison dans un thread (pool de processus), si le classement a changé"""
+        from twisted.internet.threads import deferToThread
+        from ligue1_scraper.spiders.ligue1_spider import Ligue1Spider
+
+        db = get_client(self.settings.get('MONGO_URI'))[self.settings.get('MONGO_DATABASE')]
+        deferred = deferToThread(
+            simulate_if_changed,
+            db,
+            Ligue1Spider.saison,
+            n_simulations=self.settings.getint('SIMULATION_RUNS'),
+            workers=self.settings.getint('SIMULATION_WORKERS') or None
         )
-        
-        if result.returncode == 0:
-            logger.info('✅ Spider completed successfully')
+        deferred.addCallback(self._on_simulated)
+        deferred.addErrback(lambda failure: logger.error(f'❌ Simulation failed: {failure.getErrorMessage()}'))
+        return deferred
+
+    def _on_simulated(self, doc):
+        if doc:
+            logger.info(f"🎲 {doc['n_simulations']} simulations ({doc['matchs_restants']} matchs restants) "
+                        f"in {doc['duration_s']:.2f}s, journée {doc['journee']}")
+
+    def _on_success(self, _, crawler, started):
+        duration = time.monotonic() - started
+        stats = crawler.stats.get_stats()
+        reason = stats.get('finish_reason')
+        scraped = stats.get('item_scraped_count', 0)
+        dropped = stats.get('item_dropped_count', 0)
+
+        if reason == 'closespider_timeout':
+            logger.error(f'❌ Spider timeout after {CRAWL_TIMEOUT // 60} minutes')
+        elif reason == 'finished':
+            logger.info(f'✅ Spider {crawler.spider.name} completed successfully')
         else:
-            logger.error(f'❌ Spider failed with code {result.returncode}')
-            logger.error(f'Error: {result.stderr}')
-            
-    except subprocess.TimeoutExpired:
-        logger.error('❌ Spider timeout after 5 minutes')
-    except Exception as e:
-        logger.error(f'❌ Error running spider: {e}')
+            logger.error(f'❌ Spider finished with reason: {reason}')
+
+        logger.info(f'📊 Run: {duration:.2f}s, {scraped} items scraped, {dropped} dropped')
+        for server, pool in pool_stats.snapshot().items():
+            logger.info(
+                f"🔌 MongoDB pool {server}: {pool['open']} open, {pool['checkouts']} checkouts, "
+                f"{pool['checkout_failures']} failures, max wait {pool['wait_ms_max']:.1f}ms"
+            )
+
+    def _on_error(self, failure, started):
+        duration = time.monotonic() - started
+        logger.error(f'❌ Error running spider after {duration:.2f}s: {failure.getErrorMessage()}')
+
+    def _on_finish(self, _):
+        self.running = False
+
+    def stop(self):
+        """Arrête proprement les crawls en cours"""
+        return self.runner.stop()
 
 
 def main():
@@ -58,32 +147,51 @@ def main():
         default=6,
         help='Interval in hours between scraping (default: 6)'
     )
-    
+
     args = parser.parse_args()
-    
+
+    # Un seul reactor pour toute la durée de vie du scheduler
+    settings = get_project_settings()
+    install_reactor(settings.get('TWISTED_REACTOR'))
+    from twisted.internet import reactor, task
+
+    spider_runner = SpiderRunner(settings)
+
+    # Métriques cumulées sur toutes les exécutions du processus
+    metrics_port = settings.getint('METRICS_PORT')
+    if metrics_port:
+        from prometheus_client import start_http_server
+        from ligue1_scraper.metrics import REGISTRY
+        start_http_server(metrics_port, registry=REGISTRY)
+        logger.info(f'📈 Metrics exposed on :{metrics_port}/metrics')
+
     logger.info('🚀 Ligue 1 Scheduler started')
     logger.info(f'📅 Scraping interval: every {args.interval} hours')
-    
+
     # Lancer immédiatement si demandé
     if args.immediate:
         logger.info('🔥 Running spider immediately on startup')
-        run_spider()
-    
+        reactor.callWhenRunning(spider_runner.run_spider)
+
     # Planifier les exécutions périodiques
-    schedule.every(args.interval).hours.do(run_spider)
-    
+    schedule.every(args.interval).hours.do(spider_runner.run_spider)
+
+    # Vérifier toutes les minutes, sans bloquer le reactor
+    pending = task.LoopingCall(schedule.run_pending)
+    pending.start(60, now=False)
+    reactor.addSystemEventTrigger('before', 'shutdown', spider_runner.stop)
+
     logger.info('⏰ Scheduler is running. Press Ctrl+C to stop.')
-    
+
     # Boucle principale
     try:
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Vérifier toutes les minutes
-    except KeyboardInterrupt:
-        logger.info('👋 Scheduler stopped by user')
+        reactor.run()
+        logger.info('👋 Scheduler stopped')
     except Exception as e:
         logger.error(f'❌ Scheduler error: {e}')
         sys.exit(1)
+    finally:
+        close_clients()
 
 
 if __name__ == '__main__':
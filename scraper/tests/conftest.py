@@ -0,0 +1,6 @@
+import os
+import sys
+
+# ligue1_scraper et ligue1_common ne sont pas installés : import depuis scraper/ et common/
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path[:0] = [os.path.join(ROOT, 'scraper'), os.path.join(ROOT, 'common')]
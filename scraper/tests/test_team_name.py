@@ -0,0 +1,45 @@
+"""Nom des équipes dans les lignes du classement et la grille des résultats"""
+from datetime import datetime
+
+from lxml import html
+from scrapy.http import HtmlResponse
+
+from ligue1_scraper.spiders.ligue1_spider import DEFAULT_COLUMNS, Ligue1Spider
+from ligue1_scraper.spiders.matches_spider import Ligue1MatchesSpider
+
+FLAG = '<span class="flagicon"><a href="/wiki/France"><img src="flag.png"></a></span> '
+TEAMS = ['Paris SG', 'Marseille', 'Lyon', 'Monaco']
+
+
+def team_row(cell, position=1):
+    numbers = ''.join(f'<td>{value}</td>' for value in (10, 5, 3, 1, 1, 9, 4, 5))
+    return html.fromstring(f'<table><tr><td>{position}</td><td>{cell}</td>{numbers}</tr></table>').xpath('//tr')[0]
+
+
+def test_team_row_skips_flag_link():
+    row = team_row(FLAG + '<a href="/wiki/PSG">Paris SG</a><sup>[a]</sup>')
+    team = Ligue1Spider()._parse_team_row(row, DEFAULT_COLUMNS, datetime.now())
+    assert team['equipe'] == 'Paris SG'
+    assert team['points'] == 10
+
+
+def test_team_row_without_link_uses_cell_text():
+    row = team_row(FLAG + 'Paris SG')
+    assert Ligue1Spider()._parse_team_row(row, DEFAULT_COLUMNS, datetime.now())['equipe'] == 'Paris SG'
+
+
+def test_team_row_without_name_is_skipped():
+    assert Ligue1Spider()._parse_team_row(team_row(FLAG), DEFAULT_COLUMNS, datetime.now()) is None
+
+
+def test_results_grid_skips_flag_links():
+    rows = []
+    for i, team in enumerate(TEAMS):
+        scores = ''.join('<td>—</td>' if i == j else f'<td>{i}-{j}</td>' for j in range(len(TEAMS)))
+        rows.append(f'<tr><td>{FLAG}<a href="/wiki/{i}">{team}</a></td>{scores}</tr>')
+    body = f'<html><body><table class="wikitable">{"".join(rows)}</table></body></html>'
+    response = HtmlResponse(url='https://fr.wikipedia.org/wiki/x', body=body.encode(), encoding='utf-8')
+    grid = Ligue1MatchesSpider()._find_results_grid(response)
+    assert len(grid) == len(TEAMS) * (len(TEAMS) - 1)
+    assert {home for home, _, _, _ in grid} == set(TEAMS)
+    assert ('Marseille', 'Lyon', 1, 2) in grid
@@ -5,13 +5,21 @@ Visualisation interactive des données du championnat de France
 """
 
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, dash_table, Input, Output, State, Patch
+from dash.exceptions import PreventUpdate
+from flask import jsonify, request
 import plotly.graph_objs as go
 import plotly.express as px
 import pandas as pd
 from mongo_client import MongoDBClient
+from metrics import cache_access, init_app as init_metrics, phase, timed_callback
+import hashlib
+import json
 import logging
-from datetime import datetime
+import math
+import os
+import threading
+from collections import OrderedDict
 
 # Configuration du logging
 logging.basicConfig(
@@ -23,10 +31,55 @@ logger = logging.getLogger(__name__)
 # Initialisation de l'app Dash
 app = dash.Dash(__name__, title="Ligue 1 Dashboard")
 server = app.server
+init_metrics(server)
 
 # Connexion MongoDB
 mongo_client = MongoDBClient()
 
+
+class RenderCache:
+    """Rendus des panneaux du dashboard (figures sérialisées, lignes du tableau) mémorisés par version des données
+
+    Partagé par toutes les sessions du processus : tant que les données ne changent pas,
+    les figures Plotly et le tableau ne sont construits qu'une seule fois.
+    """
+    
+    def __init__(self, max_entries=24):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, render):
+        """Retourne le rendu associé à la clé (version, panneau), en appelant render() au premier accès"""
+        if key is None:
+            # Version inconnue (MongoDB indisponible) : rien n'est mémorisé
+            self.misses += 1
+            cache_access('render', hit=False)
+            return render()
+        
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                cache_access('render', hit=True)
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            
+            self.misses += 1
+            cache_access('render', hit=False)
+            value = render()
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return value
+    
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+render_cache = RenderCache()
+
 # Couleurs personnalisées
 COLORS = {
     'background': '#0e1117',
@@ -38,6 +91,76 @@ COLORS = {
     'warning': '#ffaa00',
 }
 
+# Colonnes du tableau détaillé : (libellé, champ)
+TABLE_COLUMNS = [
+    ('Pos', 'position'), ('Équipe', 'equipe'), ('Pts', 'points'), ('J', 'matchs_joues'),
+    ('V', 'victoires'), ('N', 'nuls'), ('D', 'defaites'), ('BP', 'buts_pour'),
+    ('BC', 'buts_contre'), ('Diff', 'difference'),
+]
+TABLE_PAGE_SIZE = 20
+# Message affiché à la place des lignes quand il n'y a aucune équipe (voir update_table)
+TABLE_EMPTY_STYLE = {'textAlign': 'center', 'color': COLORS['text'], 'padding': '20px'}
+
+# Zones de la simulation de fin de saison et leur affichage (libellé, couleur)
+SIMULATION_ZONES = ('titre', 'ligue_des_champions', 'barrage', 'relegation')
+SIMULATION_LABELS = {
+    'titre': ('Titre', COLORS['primary']),
+    'ligue_des_champions': ('Top 4 (LdC)', COLORS['success']),
+    'barrage': ('Barrage', COLORS['warning']),
+    'relegation': ('Relégation', COLORS['secondary']),
+}
+
+
+def create_detailed_table():
+    """Crée le tableau détaillé (DataTable, pagination et tri côté serveur)
+
+    Les styles sont déclarés une fois par colonne / condition au lieu d'être
+    recopiés dans chaque cellule : seul le contenu de la page affichée transite.
+    """
+    cell_border = f"1px solid {COLORS['background']}"
+    
+    return dash_table.DataTable(
+        id='teams-table',
+        columns=[{'name': label, 'id': field} for label, field in TABLE_COLUMNS],
+        data=[],
+        page_action='custom',
+        page_current=0,
+        page_size=TABLE_PAGE_SIZE,
+        sort_action='custom',
+        sort_mode='single',
+        sort_by=[],
+        style_as_list_view=True,
+        style_table={'width': '100%', 'overflowX': 'auto'},
+        style_header={
+            'backgroundColor': COLORS['primary'],
+            'color': COLORS['background'],
+            'padding': '12px',
+            'textAlign': 'left',
+            'fontWeight': 'bold',
+            'borderBottom': f"2px solid {COLORS['background']}"
+        },
+        style_cell={
+            'backgroundColor': COLORS['card'],
+            'color': COLORS['text'],
+            'padding': '10px',
+            'textAlign': 'left',
+            'border': 'none',
+            'borderBottom': cell_border
+        },
+        style_cell_conditional=[
+            {'if': {'column_id': 'equipe'}, 'fontWeight': 'bold'},
+            {'if': {'column_id': 'points'}, 'fontWeight': 'bold', 'color': COLORS['primary']},
+            {'if': {'column_id': 'victoires'}, 'color': COLORS['success']},
+            {'if': {'column_id': 'nuls'}, 'color': COLORS['warning']},
+            {'if': {'column_id': 'defaites'}, 'color': COLORS['secondary']},
+        ],
+        style_data_conditional=[
+            {'if': {'column_id': 'difference', 'filter_query': '{difference} > 0'}, 'color': COLORS['success']},
+            {'if': {'column_id': 'difference', 'filter_query': '{difference} <= 0'}, 'color': COLORS['secondary']},
+        ],
+    )
+
+
 # Layout de l'application
 app.layout = html.Div(style={'backgroundColor': COLORS['background'], 'minHeight': '100vh', 'padding': '20px'}, children=[
     
@@ -49,13 +172,20 @@ app.layout = html.Div(style={'backgroundColor': COLORS['background'], 'minHeight
                style={'textAlign': 'center', 'color': COLORS['primary'], 'fontSize': '18px'}),
     ]),
     
-    # Interval pour auto-refresh
+    # Version des données : mise à jour par assets/data_version.js (long-poll de /data-version),
+    # recopiée dans le store côté client. Seul un changement de version déclenche le rendu serveur.
+    dcc.Store(id='data-version'),
     dcc.Interval(
-        id='interval-component',
-        interval=60*1000,  # 60 secondes
+        id='version-check',
+        interval=2*1000,  # Vérification locale, sans requête serveur
         n_intervals=0
     ),
     
+    # Empreinte des données affichées par chaque panneau (voir register_panel)
+    html.Div([dcc.Store(id=f'{component_id}-key') for component_id in
+              ('metrics-row', 'classement-graph', 'buteurs-graph', 'diff-graph', 'forme-graph',
+               'probas-graph')]),
+    
     # Ligne de métriques
     html.Div(id='metrics-row', style={'marginTop': '30px', 'marginBottom': '30px'}),
     
@@ -75,10 +205,19 @@ app.layout = html.Div(style={'backgroundColor': COLORS['background'], 'minHeight
                   'padding': '20px', 'borderRadius': '10px', 'verticalAlign': 'top'}),
     ], style={'marginBottom': '30px'}),
     
+    # Probabilités de fin de saison (simulation Monte Carlo du scheduler)
+    html.Div([
+        html.H3('🔮 Probabilités de Fin de Saison', style={'color': COLORS['text'], 'textAlign': 'center'}),
+        dcc.Graph(id='probas-graph')
+    ], style={'backgroundColor': COLORS['card'], 'padding': '20px', 'borderRadius': '10px', 'marginBottom': '30px'}),
+    
     # Tableau détaillé
     html.Div([
         html.H3('📊 Tableau Détaillé', style={'color': COLORS['text'], 'textAlign': 'center', 'marginBottom': '20px'}),
-        html.Div(id='table-container')
+        html.Div([
+            create_detailed_table(),
+            html.P('Aucune donnée disponible', id='table-empty', style={**TABLE_EMPTY_STYLE, 'display': 'none'})
+        ], id='table-container')
     ], style={'backgroundColor': COLORS['card'], 'padding': '20px', 'borderRadius': '10px', 'marginBottom': '30px'}),
     
     # Statistiques supplémentaires
@@ -102,176 +241,352 @@ app.layout = html.Div(style={'backgroundColor': COLORS['background'], 'minHeight
         html.P([
             '🕷️ Données scrapées depuis Wikipedia | ',
             html.Span(id='last-update', style={'color': COLORS['primary']}),
-            ' | Auto-refresh: 60s'
+            ' | Mise à jour automatique'
         ], style={'textAlign': 'center', 'color': COLORS['text'], 'marginTop': '20px'})
     ])
 ])
 
 
+# Durée maximale d'une requête long-poll sur /data-version (secondes)
+LONG_POLL_TIMEOUT = float(os.getenv('LONG_POLL_TIMEOUT', 25))
+# Requêtes long-poll simultanées par processus (0 : illimité). Avec des workers à threads,
+# gunicorn.conf.py le fixe sous GUNICORN_THREADS pour garder des threads aux callbacks.
+LONG_POLL_MAX_WAITERS = int(os.getenv('LONG_POLL_MAX_WAITERS', 0))
+_long_poll_slots = threading.BoundedSemaphore(LONG_POLL_MAX_WAITERS) if LONG_POLL_MAX_WAITERS > 0 else None
+
+
+@server.route('/data-version')
+def data_version():
+    """Long-poll : répond dès que la version des données diffère de `since`
+
+    Si toutes les places long-poll sont prises, répond 503 immédiatement :
+    assets/data_version.js réessaie après RETRY_DELAY.
+    """
+    if _long_poll_slots is not None and not _long_poll_slots.acquire(blocking=False):
+        return jsonify(error='long-poll capacity reached'), 503, {'Retry-After': '10'}
+    try:
+        mongo_client.watcher.ensure_started()
+        since = request.args.get('since')
+        version = mongo_client.watcher.wait_for_change(since, LONG_POLL_TIMEOUT)
+        return jsonify(version=version)
+    finally:
+        if _long_poll_slots is not None:
+            _long_poll_slots.release()
+
+
+@server.route('/mongo-pool')
+def mongo_pool():
+    """Statistiques du pool de connexions MongoDB de ce processus"""
+    return jsonify(pid=os.getpid(), servers=mongo_client.pool_stats())
+
+
 # Callbacks
-@app.callback(
-    [Output('metrics-row', 'children'),
-     Output('classement-graph', 'figure'),
-     Output('buteurs-graph', 'figure'),
-     Output('table-container', 'children'),
-     Output('diff-graph', 'figure'),
-     Output('forme-graph', 'figure'),
-     Output('last-update', 'children')],
-    [Input('interval-component', 'n_intervals')]
+app.clientside_callback(
+    """
+    function(n, current) {
+        var version = window.ligue1DataVersion;
+        if (version === undefined || version === current) {
+            return window.dash_clientside.no_update;
+        }
+        return version;
+    }
+    """,
+    Output('data-version', 'data'),
+    Input('version-check', 'n_intervals'),
+    State('data-version', 'data')
+)
+
+# Horodatage purement présentationnel : calculé dans le navigateur
+app.clientside_callback(
+    """
+    function(version) {
+        return new Date().toLocaleString('fr-FR');
+    }
+    """,
+    Output('last-update', 'children'),
+    Input('data-version', 'data')
 )
-def update_dashboard(n):
-    """Mise à jour de tous les éléments du dashboard"""
+
+
+# Empreinte d'un panneau sans données (figure vide)
+EMPTY_KEY = 'empty'
+
+
+def get_snapshot():
+    """Données du dashboard (une seule requête MongoDB, mise en cache par version)"""
+    return mongo_client.get_dashboard_snapshot(teams_limit=20, scorers_limit=10)
+
+
+def panel_data(panel, snapshot):
+    """Sous-ensemble des données utilisé par un panneau"""
+    teams = snapshot['teams']
+    top10 = teams[:10]
     
-    # Récupération des données
-    teams = mongo_client.get_teams(limit=20)
-    top_scorers = mongo_client.get_top_scorers(limit=10)
-    stats = mongo_client.get_stats()
-    total_teams = mongo_client.get_total_teams()
-    total_goals = mongo_client.get_total_goals()
+    if panel == 'metrics':
+        stats = snapshot['stats']
+        return {
+            'total_teams': snapshot['total_teams'],
+            'total_goals': snapshot['total_goals'],
+            'saison': stats.get('saison', '2025-2026'),
+            'journee': stats.get('journee', '-'),
+        }
+    if panel == 'classement':
+        return [{'equipe': t.get('equipe'), 'points': t.get('points')} for t in top10]
+    if panel == 'buteurs':
+        return [{'equipe': t.get('equipe'), 'buts_pour': t.get('buts_pour')} for t in snapshot['top_scorers']]
+    if panel == 'diff':
+        return [{'equipe': t.get('equipe'), 'difference': t.get('difference')} for t in top10]
+    if panel == 'forme':
+        return [{'equipe': t.get('equipe'), 'victoires': t.get('victoires'),
+                 'nuls': t.get('nuls'), 'defaites': t.get('defaites')} for t in top10]
+    if panel == 'probas':
+        simulation = snapshot.get('simulation')
+        if not simulation:
+            return []
+        return [{field: t.get(field) for field in ('equipe',) + SIMULATION_ZONES} for t in simulation['teams']]
+    return teams
+
+
+def render_panel(panel, snapshot):
+    """Retourne (empreinte des données, rendu) d'un panneau, mémorisés par version des données"""
+    callback = f'update_{panel}'
     
-    # Conversion en DataFrame
-    df = pd.DataFrame(teams) if teams else pd.DataFrame()
-    df_scorers = pd.DataFrame(top_scorers) if top_scorers else pd.DataFrame()
+    def render():
+        with phase(callback, 'prepare'):
+            data = panel_data(panel, snapshot)
+            if not data:
+                key = EMPTY_KEY
+            else:
+                payload = json.dumps(data, sort_keys=True, default=str)
+                key = hashlib.md5(payload.encode('utf-8')).hexdigest()
+        with phase(callback, 'render'):
+            return key, PANEL_RENDERERS[panel](data)
     
-    # Métriques
-    metrics = html.Div([
-        create_metric_card('🏆 Équipes', total_teams, COLORS['primary']),
-        create_metric_card('⚽ Total Buts', total_goals, COLORS['success']),
-        create_metric_card('📅 Saison', stats.get('saison', '2025-2026'), COLORS['warning']),
-        create_metric_card('📊 Journée', stats.get('journee', '-'), COLORS['secondary']),
-    ], style={'display': 'flex', 'justifyContent': 'space-around', 'flexWrap': 'wrap'})
+    version = snapshot['version']
+    return render_cache.get(None if version is None else (version, panel), render)
+
+
+def register_panel(panel, component_id, prop, patchable=False):
+    """Callback indépendant pour un panneau, déclenché par le store de version
+
+    Le store `<component_id>-key` mémorise côté client l'empreinte des données affichées :
+    un panneau inchangé n'est pas renvoyé, et une figure déjà affichée ne reçoit
+    que ses traces (Patch), la mise en page restant celle du navigateur.
+    """
+    @app.callback(
+        Output(component_id, prop),
+        Output(f'{component_id}-key', 'data'),
+        Input('data-version', 'data'),
+        State(f'{component_id}-key', 'data')
+    )
+    @timed_callback(f'update_{panel}')
+    def update_panel(version, displayed_key):
+        with phase(f'update_{panel}', 'mongo'):
+            snapshot = get_snapshot()
+        key, output = render_panel(panel, snapshot)
+        if key == displayed_key:
+            raise PreventUpdate
+        
+        if patchable and displayed_key not in (None, EMPTY_KEY) and key != EMPTY_KEY:
+            patched = Patch()
+            patched['data'] = output['data']
+            return patched, key
+        return output, key
     
-    # Graphique classement
-    if not df.empty:
-        fig_classement = go.Figure(data=[
-            go.Bar(
-                x=df['points'].head(10),
-                y=df['equipe'].head(10),
-                orientation='h',
-                marker=dict(
-                    color=df['points'].head(10),
-                    colorscale='Blues',
-                    showscale=False
-                ),
-                text=df['points'].head(10),
-                textposition='auto',
-            )
-        ])
-        fig_classement.update_layout(
-            paper_bgcolor=COLORS['card'],
-            plot_bgcolor=COLORS['card'],
-            font=dict(color=COLORS['text']),
-            xaxis_title='Points',
-            yaxis=dict(autorange='reversed'),
-            height=500,
-            margin=dict(l=20, r=20, t=20, b=20)
-        )
-    else:
-        fig_classement = create_empty_figure('Aucune donnée disponible')
+    return update_panel
+
+
+def render_metrics(data):
+    """Ligne de métriques"""
+    return html.Div([
+        create_metric_card('🏆 Équipes', data['total_teams'], COLORS['primary']),
+        create_metric_card('⚽ Total Buts', data['total_goals'], COLORS['success']),
+        create_metric_card('📅 Saison', data['saison'], COLORS['warning']),
+        create_metric_card('📊 Journée', data['journee'], COLORS['secondary']),
+    ], style={'display': 'flex', 'justifyContent': 'space-around', 'flexWrap': 'wrap'})
+
+
+def render_classement(data):
+    """Graphique classement (figure sérialisée)"""
+    if not data:
+        return create_empty_figure('Aucune donnée disponible').to_dict()
     
-    # Graphique buteurs
-    if not df_scorers.empty:
-        fig_buteurs = go.Figure(data=[
-            go.Bar(
-                x=df_scorers['equipe'],
-                y=df_scorers['buts_pour'],
-                marker=dict(
-                    color=df_scorers['buts_pour'],
-                    colorscale='Reds',
-                    showscale=False
-                ),
-                text=df_scorers['buts_pour'],
-                textposition='auto',
-            )
-        ])
-        fig_buteurs.update_layout(
-            paper_bgcolor=COLORS['card'],
-            plot_bgcolor=COLORS['card'],
-            font=dict(color=COLORS['text']),
-            yaxis_title='Buts marqués',
-            xaxis_tickangle=-45,
-            height=400,
-            margin=dict(l=20, r=20, t=20, b=80)
+    df = pd.DataFrame(data)
+    fig_classement = go.Figure(data=[
+        go.Bar(
+            x=df['points'],
+            y=df['equipe'],
+            orientation='h',
+            marker=dict(
+                color=df['points'],
+                colorscale='Blues',
+                showscale=False
+            ),
+            text=df['points'],
+            textposition='auto',
         )
-    else:
-        fig_buteurs = create_empty_figure('Aucune donnée disponible')
-    
-    # Tableau détaillé
-    if not df.empty:
-        table = create_detailed_table(df)
-    else:
-        table = html.P('Aucune donnée disponible', 
-                      style={'textAlign': 'center', 'color': COLORS['text'], 'padding': '20px'})
+    ])
+    fig_classement.update_layout(
+        paper_bgcolor=COLORS['card'],
+        plot_bgcolor=COLORS['card'],
+        font=dict(color=COLORS['text']),
+        xaxis_title='Points',
+        yaxis=dict(autorange='reversed'),
+        height=500,
+        margin=dict(l=20, r=20, t=20, b=20)
+    )
+    return fig_classement.to_dict()
+
+
+def render_buteurs(data):
+    """Graphique buteurs (figure sérialisée)"""
+    if not data:
+        return create_empty_figure('Aucune donnée disponible').to_dict()
     
-    # Graphique différence de buts
-    if not df.empty:
-        fig_diff = go.Figure(data=[
-            go.Bar(
-                x=df['equipe'].head(10),
-                y=df['difference'].head(10),
-                marker=dict(
-                    color=df['difference'].head(10),
-                    colorscale='RdYlGn',
-                    showscale=False,
-                    cmin=-20,
-                    cmax=20
-                ),
-                text=df['difference'].head(10),
-                textposition='auto',
-            )
-        ])
-        fig_diff.update_layout(
-            paper_bgcolor=COLORS['card'],
-            plot_bgcolor=COLORS['card'],
-            font=dict(color=COLORS['text']),
-            yaxis_title='Différence',
-            xaxis_tickangle=-45,
-            height=400,
-            margin=dict(l=20, r=20, t=20, b=80)
+    df_scorers = pd.DataFrame(data)
+    fig_buteurs = go.Figure(data=[
+        go.Bar(
+            x=df_scorers['equipe'],
+            y=df_scorers['buts_pour'],
+            marker=dict(
+                color=df_scorers['buts_pour'],
+                colorscale='Reds',
+                showscale=False
+            ),
+            text=df_scorers['buts_pour'],
+            textposition='auto',
         )
-    else:
-        fig_diff = create_empty_figure('Aucune donnée disponible')
+    ])
+    fig_buteurs.update_layout(
+        paper_bgcolor=COLORS['card'],
+        plot_bgcolor=COLORS['card'],
+        font=dict(color=COLORS['text']),
+        yaxis_title='Buts marqués',
+        xaxis_tickangle=-45,
+        height=400,
+        margin=dict(l=20, r=20, t=20, b=80)
+    )
+    return fig_buteurs.to_dict()
+
+
+def render_diff(data):
+    """Graphique différence de buts (figure sérialisée)"""
+    if not data:
+        return create_empty_figure('Aucune donnée disponible').to_dict()
     
-    # Graphique forme
-    if not df.empty:
-        fig_forme = go.Figure(data=[
-            go.Bar(
-                name='Victoires',
-                x=df['equipe'].head(10),
-                y=df['victoires'].head(10),
-                marker_color=COLORS['success']
+    df = pd.DataFrame(data)
+    fig_diff = go.Figure(data=[
+        go.Bar(
+            x=df['equipe'],
+            y=df['difference'],
+            marker=dict(
+                color=df['difference'],
+                colorscale='RdYlGn',
+                showscale=False,
+                cmin=-20,
+                cmax=20
             ),
-            go.Bar(
-                name='Nuls',
-                x=df['equipe'].head(10),
-                y=df['nuls'].head(10),
-                marker_color=COLORS['warning']
-            ),
-            go.Bar(
-                name='Défaites',
-                x=df['equipe'].head(10),
-                y=df['defaites'].head(10),
-                marker_color=COLORS['secondary']
-            )
-        ])
-        fig_forme.update_layout(
-            barmode='stack',
-            paper_bgcolor=COLORS['card'],
-            plot_bgcolor=COLORS['card'],
-            font=dict(color=COLORS['text']),
-            yaxis_title='Matchs',
-            xaxis_tickangle=-45,
-            height=400,
-            legend=dict(orientation='h', y=1.1),
-            margin=dict(l=20, r=20, t=40, b=80)
+            text=df['difference'],
+            textposition='auto',
         )
-    else:
-        fig_forme = create_empty_figure('Aucune donnée disponible')
+    ])
+    fig_diff.update_layout(
+        paper_bgcolor=COLORS['card'],
+        plot_bgcolor=COLORS['card'],
+        font=dict(color=COLORS['text']),
+        yaxis_title='Différence',
+        xaxis_tickangle=-45,
+        height=400,
+        margin=dict(l=20, r=20, t=20, b=80)
+    )
+    return fig_diff.to_dict()
+
+
+def render_forme(data):
+    """Graphique forme V-N-D (figure sérialisée)"""
+    if not data:
+        return create_empty_figure('Aucune donnée disponible').to_dict()
     
-    # Dernière mise à jour
-    last_update = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+    df = pd.DataFrame(data)
+    fig_forme = go.Figure(data=[
+        go.Bar(
+            name='Victoires',
+            x=df['equipe'],
+            y=df['victoires'],
+            marker_color=COLORS['success']
+        ),
+        go.Bar(
+            name='Nuls',
+            x=df['equipe'],
+            y=df['nuls'],
+            marker_color=COLORS['warning']
+        ),
+        go.Bar(
+            name='Défaites',
+            x=df['equipe'],
+            y=df['defaites'],
+            marker_color=COLORS['secondary']
+        )
+    ])
+    fig_forme.update_layout(
+        barmode='stack',
+        paper_bgcolor=COLORS['card'],
+        plot_bgcolor=COLORS['card'],
+        font=dict(color=COLORS['text']),
+        yaxis_title='Matchs',
+        xaxis_tickangle=-45,
+        height=400,
+        legend=dict(orientation='h', y=1.1),
+        margin=dict(l=20, r=20, t=40, b=80)
+    )
+    return fig_forme.to_dict()
+
+
+def render_probas(data):
+    """Probabilités de fin de saison par équipe, dans l'ordre du classement (figure sérialisée)"""
+    if not data:
+        return create_empty_figure('Simulation non disponible').to_dict()
     
-    return metrics, fig_classement, fig_buteurs, table, fig_diff, fig_forme, last_update
+    df = pd.DataFrame(data)
+    fig_probas = go.Figure(data=[
+        go.Bar(
+            name=SIMULATION_LABELS[zone][0],
+            x=df['equipe'],
+            y=df[zone] * 100,
+            marker_color=SIMULATION_LABELS[zone][1],
+            hovertemplate='%{x}: %{y:.1f}%<extra>' + SIMULATION_LABELS[zone][0] + '</extra>'
+        )
+        for zone in SIMULATION_ZONES
+    ])
+    fig_probas.update_layout(
+        barmode='group',
+        paper_bgcolor=COLORS['card'],
+        plot_bgcolor=COLORS['card'],
+        font=dict(color=COLORS['text']),
+        yaxis=dict(title='Probabilité (%)', range=[0, 100]),
+        xaxis_tickangle=-45,
+        height=450,
+        legend=dict(orientation='h', y=1.1),
+        margin=dict(l=20, r=20, t=40, b=80)
+    )
+    return fig_probas.to_dict()
+
+
+PANEL_RENDERERS = {
+    'metrics': render_metrics,
+    'classement': render_classement,
+    'buteurs': render_buteurs,
+    'diff': render_diff,
+    'forme': render_forme,
+    'probas': render_probas,
+}
+
+update_metrics = register_panel('metrics', 'metrics-row', 'children')
+update_classement = register_panel('classement', 'classement-graph', 'figure', patchable=True)
+update_buteurs = register_panel('buteurs', 'buteurs-graph', 'figure', patchable=True)
+update_diff = register_panel('diff', 'diff-graph', 'figure', patchable=True)
+update_forme = register_panel('forme', 'forme-graph', 'figure', patchable=True)
+update_probas = register_panel('probas', 'probas-graph', 'figure', patchable=True)
 
 
 def create_metric_card(title, value, color):
@@ -312,69 +627,54 @@ def create_empty_figure(message):
     return fig
 
 
-def create_detailed_table(df):
-    """Crée un tableau HTML détaillé"""
-    
-    # Style du tableau
-    table_style = {
-        'width': '100%',
-        'borderCollapse': 'collapse',
-        'color': COLORS['text']
-    }
-    
-    header_style = {
-        'backgroundColor': COLORS['primary'],
-        'color': COLORS['background'],
-        'padding': '12px',
-        'textAlign': 'left',
-        'fontWeight': 'bold',
-        'borderBottom': f"2px solid {COLORS['background']}"
-    }
-    
-    cell_style = {
-        'padding': '10px',
-        'borderBottom': f"1px solid {COLORS['background']}"
-    }
-    
-    # Création du header
-    header = html.Thead(html.Tr([
-        html.Th('Pos', style=header_style),
-        html.Th('Équipe', style=header_style),
-        html.Th('Pts', style=header_style),
-        html.Th('J', style=header_style),
-        html.Th('V', style=header_style),
-        html.Th('N', style=header_style),
-        html.Th('D', style=header_style),
-        html.Th('BP', style=header_style),
-        html.Th('BC', style=header_style),
-        html.Th('Diff', style=header_style),
-    ]))
-    
-    # Création des lignes
-    rows = []
-    for _, row in df.iterrows():
-        rows.append(html.Tr([
-            html.Td(row['position'], style=cell_style),
-            html.Td(row['equipe'], style={**cell_style, 'fontWeight': 'bold'}),
-            html.Td(row['points'], style={**cell_style, 'fontWeight': 'bold', 'color': COLORS['primary']}),
-            html.Td(row.get('matchs_joues', '-'), style=cell_style),
-            html.Td(row.get('victoires', '-'), style={**cell_style, 'color': COLORS['success']}),
-            html.Td(row.get('nuls', '-'), style={**cell_style, 'color': COLORS['warning']}),
-            html.Td(row.get('defaites', '-'), style={**cell_style, 'color': COLORS['secondary']}),
-            html.Td(row.get('buts_pour', '-'), style=cell_style),
-            html.Td(row.get('buts_contre', '-'), style=cell_style),
-            html.Td(
-                row.get('difference', '-'),
-                style={
-                    **cell_style,
-                    'color': COLORS['success'] if row.get('difference', 0) > 0 else COLORS['secondary']
-                }
-            ),
-        ]))
-    
-    tbody = html.Tbody(rows)
+def table_records(snapshot):
+    """Lignes du tableau (non triées), mémorisées par version des données"""
+    def render():
+        fields = [field for _, field in TABLE_COLUMNS]
+        return [{field: team.get(field) for field in fields} for team in snapshot['teams']]
     
-    return html.Table([header, tbody], style=table_style)
+    version = snapshot['version']
+    return render_cache.get(None if version is None else (version, 'table'), render)
+
+
+def sorted_table_records(snapshot, sort_by):
+    """Lignes du tableau triées colonne par colonne
+
+    Le tri (une vingtaine de lignes) est refait à chaque requête : mémoriser chaque tri
+    évincerait du cache les rendus des panneaux partagés par toutes les sessions.
+    """
+    records = table_records(snapshot)
+    for s in reversed(sort_by or []):
+        column = s['column_id']
+        # Tri stable ; valeurs manquantes en dernier dans les deux sens
+        present = [record for record in records if record.get(column) is not None]
+        missing = [record for record in records if record.get(column) is None]
+        records = sorted(present, key=lambda record: record[column], reverse=s['direction'] == 'desc') + missing
+    return records
+
+
+@app.callback(
+    Output('teams-table', 'data'),
+    Output('teams-table', 'page_count'),
+    Output('table-empty', 'style'),
+    Input('data-version', 'data'),
+    Input('teams-table', 'page_current'),
+    Input('teams-table', 'page_size'),
+    Input('teams-table', 'sort_by')
+)
+@timed_callback('update_table')
+def update_table(version, page_current, page_size, sort_by):
+    """Page courante du tableau détaillé ("Aucune donnée disponible" si aucune équipe)"""
+    with phase('update_table', 'mongo'):
+        snapshot = get_snapshot()
+    with phase('update_table', 'sort'):
+        records = sorted_table_records(snapshot, sort_by)
+    page_size = page_size or TABLE_PAGE_SIZE
+    page_current = page_current or 0
+    page_count = max(1, math.ceil(len(records) / page_size))
+    start = page_current * page_size
+    empty_style = {**TABLE_EMPTY_STYLE, 'display': 'none' if records else 'block'}
+    return records[start:start + page_size], page_count, empty_style
 
 
 if __name__ == '__main__':
@@ -0,0 +1,31 @@
+// Long-poll de /data-version : window.ligue1DataVersion change dès que le spider écrit
+// de nouvelles données. Le callback client "version-check" la recopie dans le store
+// "data-version", qui déclenche le rendu du dashboard.
+(function () {
+    var RETRY_DELAY = 10000;
+    var version = null;
+
+    function poll() {
+        var url = '/data-version';
+        if (version !== null) {
+            url += '?since=' + encodeURIComponent(version);
+        }
+        fetch(url, {cache: 'no-store'})
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                return response.json();
+            })
+            .then(function (data) {
+                version = data.version;
+                window.ligue1DataVersion = version;
+                setTimeout(poll, 0);
+            })
+            .catch(function () {
+                setTimeout(poll, RETRY_DELAY);
+            });
+    }
+
+    poll();
+})();
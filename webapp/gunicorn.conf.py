@@ -0,0 +1,73 @@
+"""
+Configuration gunicorn du dashboard (production)
+
+    gunicorn -c gunicorn.conf.py app:server
+
+Workers gevent par défaut : une requête long-poll sur /data-version (jusqu'à
+LONG_POLL_TIMEOUT secondes) n'occupe qu'une greenlet, pas un thread. gevent patchant la
+bibliothèque standard au démarrage du worker, l'application est chargée dans chaque
+worker (pas de preload). Avec gthread, elle est chargée une seule fois dans le maître
+(index, vérification des plans de requête), puis chaque worker recrée après le fork son
+propre client MongoDB, son cache et son watcher ; les long-polls y sont limités à une
+partie des threads (LONG_POLL_MAX_WAITERS) pour garder de la place aux callbacks.
+"""
+import glob
+import multiprocessing
+import os
+import sys
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8050')
+
+# gevent : milliers de connexions long-poll par worker ; gthread : threads dans chaque worker
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# gthread : chaque long-poll bloque un thread pendant LONG_POLL_TIMEOUT, on en réserve
+# GUNICORN_CALLBACK_THREADS aux callbacks Dash (lu par app.py dans chaque worker)
+if worker_class == 'gthread':
+    callback_threads = int(os.getenv('GUNICORN_CALLBACK_THREADS', max(threads // 2, 1)))
+    os.environ.setdefault('LONG_POLL_MAX_WAITERS', str(max(threads - callback_threads, 1)))
+
+# gevent doit patcher la bibliothèque standard avant le chargement de l'application : pas de preload
+preload_app = os.getenv('GUNICORN_PRELOAD', str(worker_class != 'gevent')).lower() == 'true'
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# Supérieur à LONG_POLL_TIMEOUT : une requête long-poll n'est pas un worker bloqué
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+
+# Métriques multiprocessus : le dossier est vidé avant le chargement de l'application
+prometheus_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+if prometheus_dir:
+    os.makedirs(prometheus_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(prometheus_dir, '*.db')):
+        os.remove(path)
+
+
+def when_ready(server):
+    """Ferme les connexions du maître avant le lancement des workers"""
+    if preload_app:
+        from app import mongo_client
+        mongo_client.close()
+
+
+def post_fork(server, worker):
+    """Client MongoDB, cache et watcher propres au worker (application préchargée seulement)
+
+    Appelé avant l'initialisation du worker (et donc avant le patch gevent) : sans preload,
+    l'application n'est pas importée ici mais par le worker, qui crée ses propres ressources.
+    """
+    if server.cfg.preload_app:
+        sys.modules['app'].mongo_client.reset_after_fork()
+
+
+def child_exit(server, worker):
+    """Retire les métriques des workers arrêtés (jauges multiprocessus)"""
+    if prometheus_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,119 @@
+"""
+Métriques Prometheus du dashboard, exposées sur /metrics
+
+Avec plusieurs processus (workers gunicorn), définir PROMETHEUS_MULTIPROC_DIR
+(dossier vide au démarrage) : chaque processus y écrit ses valeurs et /metrics
+agrège tous les workers.
+"""
+from contextlib import contextmanager
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+import functools
+import os
+import time
+
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+REQUEST_LATENCY = Histogram(
+    'dashboard_http_request_seconds', 'Durée des requêtes HTTP par route',
+    ['endpoint', 'method', 'status'], buckets=FAST_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'dashboard_http_response_bytes', 'Taille des réponses HTTP par route',
+    ['endpoint'], buckets=SIZE_BUCKETS
+)
+CALLBACK_PAYLOAD_SIZE = Histogram(
+    'dashboard_callback_response_bytes', 'Taille des réponses de callbacks Dash, par sortie',
+    ['output'], buckets=SIZE_BUCKETS
+)
+CALLBACK_LATENCY = Histogram(
+    'dashboard_callback_seconds', 'Durée des callbacks Dash',
+    ['callback'], buckets=FAST_BUCKETS
+)
+PHASE_LATENCY = Histogram(
+    'dashboard_callback_phase_seconds', 'Durée de chaque étape d\'un callback (mongo, prepare, render...)',
+    ['callback', 'phase'], buckets=FAST_BUCKETS
+)
+MONGO_QUERY_LATENCY = Histogram(
+    'dashboard_mongo_query_seconds', 'Durée des requêtes MongoDB du dashboard',
+    ['query'], buckets=FAST_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    'dashboard_cache_requests_total', 'Accès aux caches du dashboard (hit / miss)',
+    ['cache', 'result']
+)
+
+
+def timed_callback(name):
+    """Mesure la durée totale d'un callback Dash (PreventUpdate compris)"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with CALLBACK_LATENCY.labels(name).time():
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def phase(callback, name):
+    """Mesure une étape d'un callback"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_LATENCY.labels(callback, name).observe(time.perf_counter() - started)
+
+
+def timed_query(name):
+    """Mesure la durée d'une méthode de MongoDBClient"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with MONGO_QUERY_LATENCY.labels(name).time():
+                return method(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cache_access(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def registry():
+    """Registre à exporter : agrégation des workers en mode multiprocessus"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        aggregated = CollectorRegistry()
+        multiprocess.MultiProcessCollector(aggregated)
+        return aggregated
+    return REGISTRY
+
+
+def init_app(server):
+    """Mesure chaque requête HTTP du serveur Flask et ajoute la route /metrics"""
+    @server.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @server.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            # Route déclarée plutôt que chemin réel : nombre de séries borné
+            endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+            REQUEST_LATENCY.labels(endpoint, request.method, str(response.status_code)).observe(
+                time.perf_counter() - started
+            )
+            if response.content_length is not None:
+                RESPONSE_SIZE.labels(endpoint).observe(response.content_length)
+                if endpoint.endswith('_dash-update-component'):
+                    body = request.get_json(silent=True) or {}
+                    CALLBACK_PAYLOAD_SIZE.labels(body.get('output', '')).observe(response.content_length)
+        return response
+
+    @server.route('/metrics')
+    def metrics():
+        return Response(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
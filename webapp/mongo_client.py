@@ -1,10 +1,154 @@
-from pymongo import MongoClient
+from pymongo.errors import OperationFailure, PyMongoError
 import os
 import logging
+import threading
+import time
+
+from ligue1_common.connection import get_client, pool_stats, reset_after_fork
+from ligue1_common.indexes import ensure_indexes, uses_collscan
+from ligue1_common.standings import SeasonMatches, standings_at, standings_by_journee
+from metrics import cache_access, timed_query
 
 logger = logging.getLogger(__name__)
 
 
+class VersionedCache:
+    """Cache mémoire partagé par tous les threads du processus
+
+    Une entrée reste valide tant que la version des données (incrémentée par le
+    pipeline du spider) ne change pas, dans la limite de ``ttl`` secondes. La version
+    elle-même n'est relue qu'une fois toutes les ``check_interval`` secondes.
+    """
+    
+    def __init__(self, version_func, ttl=300, check_interval=5):
+        self.version_func = version_func
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}              # clé -> (version, date de chargement, valeur)
+        self._version = None
+        self._version_checked = None
+        self._lock = threading.Lock()
+    
+    def current_version(self):
+        """Version des données, relue au plus une fois par intervalle"""
+        with self._lock:
+            return self._current_version()
+    
+    def _current_version(self):
+        now = time.monotonic()
+        if self._version_checked is None or now - self._version_checked >= self.check_interval:
+            self._version = self.version_func()
+            self._version_checked = now
+        return self._version
+    
+    def get(self, key, loader):
+        """Retourne (version, valeur), en appelant loader() une seule fois par version"""
+        # Le verrou est conservé pendant le chargement : les requêtes concurrentes attendent
+        # le résultat au lieu de toutes interroger MongoDB
+        with self._lock:
+            version = self._current_version()
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry and entry[0] == version and now - entry[1] < self.ttl:
+                self.hits += 1
+                cache_access('data', hit=True)
+                return version, entry[2]
+            
+            self.misses += 1
+            cache_access('data', hit=False)
+            value = loader()
+            self._entries[key] = (version, now, value)
+            return version, value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version_checked = None
+
+
+class DataVersionWatcher:
+    """Publie la version des données en suivant les écritures du spider
+
+    Utilise un change stream MongoDB (replica set) et se replie sur un polling
+    périodique pour un mongod standalone. Le thread n'est démarré qu'au premier
+    besoin, ce qui le rend compatible avec un fork (gunicorn --preload).
+    """
+    
+    # Code d'erreur renvoyé par un mongod standalone ($changeStream indisponible)
+    CHANGE_STREAM_UNSUPPORTED = 40573
+    
+    def __init__(self, mongo_client, collections=('ligue1_teams', 'ligue1_stats', 'ligue1_meta'),
+                 poll_interval=5):
+        self.mongo_client = mongo_client
+        self.collections = list(collections)
+        self.poll_interval = poll_interval
+        self.version = None             # Version sous forme de chaîne ('' si aucune donnée)
+        self._thread = None
+        self._condition = threading.Condition()
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def ensure_started(self):
+        """Démarre le thread de surveillance s'il ne tourne pas (ex: après un fork)"""
+        with self._condition:
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name='data-version-watcher', daemon=True)
+            self._thread.start()
+    
+    def wait_for_change(self, since, timeout):
+        """Bloque jusqu'à ce que la version diffère de `since` (ou jusqu'au timeout)"""
+        with self._condition:
+            if since is not None:
+                self._condition.wait_for(lambda: self.version is not None and self.version != since, timeout)
+            else:
+                self._condition.wait_for(lambda: self.version is not None, timeout)
+            return self.version
+    
+    def _publish(self, version):
+        version = '' if version is None else str(version)
+        with self._condition:
+            if version != self.version:
+                self.version = version
+                self._condition.notify_all()
+    
+    def _run(self):
+        self._publish(self.mongo_client.get_data_version())
+        while True:
+            try:
+                self._watch()
+            except OperationFailure as e:
+                if e.code == self.CHANGE_STREAM_UNSUPPORTED:
+                    logger.warning(f'Change streams unavailable, polling data version every {self.poll_interval}s')
+                    self._poll()
+                    return
+                logger.error(f'Data version watcher error: {e}')
+                time.sleep(self.poll_interval)
+            except PyMongoError as e:
+                logger.error(f'Data version watcher error: {e}')
+                time.sleep(self.poll_interval)
+    
+    def _watch(self):
+        pipeline = [{'$match': {'ns.coll': {'$in': self.collections}}}]
+        with self.mongo_client.db.watch(pipeline) as stream:
+            logger.info('Watching data changes with a change stream')
+            for _ in stream:
+                self._publish(self.mongo_client.get_data_version())
+    
+    def _poll(self):
+        while True:
+            self._publish(self.mongo_client.get_data_version())
+            time.sleep(self.poll_interval)
+
+
+class QueryPlanError(RuntimeError):
+    """Une requête du dashboard parcourt toute une collection (COLLSCAN) ou un index n'a pas pu être créé"""
+
+
 class MongoDBClient:
     """Client MongoDB pour récupérer les données"""
     
@@ -13,12 +157,35 @@ class MongoDBClient:
         self.db_name = os.getenv('MONGO_DB', 'ligue1_db')
         self.client = None
         self.db = None
+        self._init_process_state()
         self.connect()
     
+    def _init_process_state(self):
+        """Watcher et cache propres au processus courant"""
+        self.watcher = DataVersionWatcher(self, poll_interval=float(os.getenv('DATA_VERSION_CHECK_INTERVAL', 5)))
+        self.cache = VersionedCache(
+            self.current_data_version,
+            ttl=int(os.getenv('DASHBOARD_CACHE_TTL', 300)),
+            check_interval=float(os.getenv('DATA_VERSION_CHECK_INTERVAL', 5))
+        )
+    
+    def reset_after_fork(self):
+        """À appeler dans chaque worker après le fork (hook post_fork de gunicorn)
+
+        Le client hérité du processus maître n'est pas réutilisé : le worker crée son propre
+        pool (connexions ouvertes à la première requête) et son propre cache ; le watcher
+        démarre au premier long-poll.
+        """
+        reset_after_fork()
+        self._init_process_state()
+        self.client = get_client(self.mongo_uri, appname='ligue1-dashboard')
+        self.db = self.client[self.db_name]
+    
     def connect(self):
         """Connexion à MongoDB"""
         try:
-            self.client = MongoClient(self.mongo_uri)
+            # Client partagé du processus : pool, timeouts et compression configurés par l'environnement
+            self.client = get_client(self.mongo_uri, appname='ligue1-dashboard')
             self.db = self.client[self.db_name]
             # Test de connexion
             self.client.admin.command('ping')
@@ -26,7 +193,69 @@ class MongoDBClient:
         except Exception as e:
             logger.error(f'MongoDB connection error: {e}')
             raise
+        
+        # Index créés par le premier service démarré (spider ou dashboard)
+        failed = ensure_indexes(self.db)
+        mode = os.getenv('QUERY_PLAN_CHECK', 'strict')
+        if failed:
+            # Cause réelle des COLLSCAN que détecterait la vérification des plans
+            message = f'Could not build indexes: {", ".join(failed)} (see errors above)'
+            logger.error(message)
+            if mode == 'strict':
+                raise QueryPlanError(message)
+        if mode != 'off':
+            self.check_query_plans(strict=(mode == 'strict'))
     
+    def check_query_plans(self, strict=True):
+        """Vérifie qu'aucune requête du dashboard n'est un parcours complet de collection
+
+        En mode strict, lève QueryPlanError : un index manquant empêche le démarrage.
+        """
+        collscans = []
+        for name, explain in self._dashboard_queries().items():
+            try:
+                plan = explain()
+            except PyMongoError as e:
+                logger.warning(f'Could not explain query {name}: {e}')
+                continue
+            if uses_collscan(plan):
+                collscans.append(name)
+        
+        if collscans:
+            message = f'COLLSCAN in dashboard queries: {", ".join(collscans)}'
+            logger.error(message)
+            if strict:
+                raise QueryPlanError(message)
+        else:
+            logger.info('Query plans OK (no COLLSCAN)')
+        return collscans
+    
+    def _dashboard_queries(self):
+        """Requêtes servies par le dashboard -> fonction retournant leur plan d'exécution"""
+        db = self.db
+        return {
+            'dashboard_snapshot': lambda: db.command(
+                'aggregate', 'ligue1_teams', pipeline=self._dashboard_pipeline(20, 10), explain=True
+            ),
+            'teams': lambda: db.ligue1_teams.find({}, {'_id': 0}).sort('position', 1).limit(20).explain(),
+            'top_scorers': lambda: db.ligue1_teams.find(
+                {}, {'_id': 0, 'equipe': 1, 'buts_pour': 1, 'position': 1}
+            ).sort('buts_pour', -1).limit(10).explain(),
+            'latest_stats': lambda: db.ligue1_stats.find({}, {'_id': 0}).sort('scraped_date', -1).limit(1).explain(),
+            'data_version': lambda: db.ligue1_meta.find({'_id': 'data_version'}).limit(1).explain(),
+            'standings_at': lambda: db.command(
+                'aggregate', 'standings_history', pipeline=self._standings_pipeline(38, '2025-2026', 'ligue1'),
+                explain=True
+            ),
+            'points_trajectory': lambda: db.standings_history.find(
+                {'equipe': '', 'ligue': 'ligue1', 'saison': '2025-2026'},
+                {'_id': 0, 'journee': 1, 'points': 1, 'position': 1, 'difference': 1}
+            ).sort('journee', 1).explain(),
+            'latest_simulation': lambda: db.ligue1_simulations.find({}, {'_id': 0}).sort('computed_at', -1).limit(1).explain(),
+            'season_matches': lambda: db.ligue1_matches.find({'saison': '2025-2026'}, {'_id': 0}).explain(),
+        }
+    
+    @timed_query('teams')
     def get_teams(self, limit=20):
         """Récupère les équipes triées par classement"""
         try:
@@ -39,6 +268,7 @@ class MongoDBClient:
             logger.error(f'Error fetching teams: {e}')
             return []
     
+    @timed_query('top_scorers')
     def get_top_scorers(self, limit=10):
         """Récupère les équipes avec le plus de buts marqués"""
         try:
@@ -51,6 +281,7 @@ class MongoDBClient:
             logger.error(f'Error fetching top scorers: {e}')
             return []
     
+    @timed_query('stats')
     def get_stats(self):
         """Récupère les statistiques générales"""
         try:
@@ -70,6 +301,7 @@ class MongoDBClient:
             logger.error(f'Error fetching stats: {e}')
             return {}
     
+    @timed_query('total_teams')
     def get_total_teams(self):
         """Compte le nombre total d'équipes"""
         try:
@@ -78,6 +310,7 @@ class MongoDBClient:
             logger.error(f'Error counting teams: {e}')
             return 0
     
+    @timed_query('total_goals')
     def get_total_goals(self):
         """Calcule le total de buts marqués"""
         try:
@@ -95,6 +328,200 @@ class MongoDBClient:
             logger.error(f'Error calculating total goals: {e}')
             return 0
     
+    @timed_query('data_version')
+    def get_data_version(self):
+        """Version des données publiée par le pipeline (ou date du dernier scraping à défaut)"""
+        try:
+            meta = self.db.ligue1_meta.find_one({'_id': 'data_version'})
+            if meta:
+                return meta.get('version')
+            latest = self.db.ligue1_stats.find_one({}, {'_id': 0, 'scraped_date': 1}, sort=[('scraped_date', -1)])
+            return str(latest['scraped_date']) if latest else None
+        except Exception as e:
+            logger.error(f'Error fetching data version: {e}')
+            return None
+    
+    def current_data_version(self):
+        """Version publiée par le watcher s'il tourne, sinon lue directement en base"""
+        if self.watcher.running and self.watcher.version is not None:
+            return self.watcher.version
+        version = self.get_data_version()
+        return None if version is None else str(version)
+    
+    def get_dashboard_snapshot(self, teams_limit=20, scorers_limit=10):
+        """Données du dashboard, servies depuis le cache tant que la version ne change pas"""
+        try:
+            version, snapshot = self.cache.get(
+                ('dashboard', teams_limit, scorers_limit),
+                lambda: self._fetch_dashboard_snapshot(teams_limit, scorers_limit)
+            )
+        except Exception as e:
+            # Erreur non mise en cache : la prochaine requête réessaiera
+            logger.error(f'Error fetching dashboard snapshot: {e}')
+            version, snapshot = None, self._build_snapshot({})
+        return {**snapshot, 'version': version}
+    
+    @timed_query('dashboard_snapshot')
+    def _fetch_dashboard_snapshot(self, teams_limit, scorers_limit):
+        """Récupère toutes les données du dashboard en un seul aller-retour ($facet + $lookup)"""
+        result = next(self.db.ligue1_teams.aggregate(self._dashboard_pipeline(teams_limit, scorers_limit)), {})
+        return self._build_snapshot(result)
+    
+    @staticmethod
+    def _dashboard_pipeline(teams_limit, scorers_limit):
+        return [
+            # Tri en tête de pipeline : parcours de l'index position plutôt qu'un COLLSCAN
+            {'$sort': {'position': 1}},
+            {
+                '$facet': {
+                    'teams': [
+                        {'$limit': teams_limit},
+                        {'$project': {'_id': 0}}
+                    ],
+                    'top_scorers': [
+                        {'$sort': {'buts_pour': -1}},
+                        {'$limit': scorers_limit},
+                        {'$project': {'_id': 0, 'equipe': 1, 'buts_pour': 1, 'position': 1}}
+                    ],
+                    'totals': [
+                        {'$group': {'_id': None, 'total_equipes': {'$sum': 1}, 'total_buts': {'$sum': '$buts_pour'}}}
+                    ]
+                }
+            },
+            # $facet produit toujours un document : la dernière ligne de stats est jointe une seule fois
+            {
+                '$lookup': {
+                    'from': 'ligue1_stats',
+                    'pipeline': [
+                        {'$sort': {'scraped_date': -1}},
+                        {'$limit': 1},
+                        {'$project': {'_id': 0}}
+                    ],
+                    'as': 'stats'
+                }
+            },
+            # Dernière simulation de fin de saison (calculée par le scheduler)
+            {
+                '$lookup': {
+                    'from': 'ligue1_simulations',
+                    'pipeline': [
+                        {'$sort': {'computed_at': -1}},
+                        {'$limit': 1},
+                        {'$project': {'_id': 0, 'saison': 1, 'journee': 1, 'n_simulations': 1, 'teams': 1}}
+                    ],
+                    'as': 'simulation'
+                }
+            }
+        ]
+    
+    @staticmethod
+    def _build_snapshot(result):
+        """Met en forme le résultat de l'agrégation (vide si MongoDB est indisponible)"""
+        totals = (result.get('totals') or [{}])[0]
+        total_teams = totals.get('total_equipes', 0)
+        stats = (result.get('stats') or [None])[0]
+        if not stats:
+            # Calculer depuis les équipes si pas de stats
+            stats = {'total_equipes': total_teams, 'saison': '2025-2026'}
+        
+        return {
+            'teams': result.get('teams', []),
+            'top_scorers': result.get('top_scorers', []),
+            'stats': stats,
+            'total_teams': total_teams,
+            'total_goals': totals.get('total_buts', 0),
+            'simulation': (result.get('simulation') or [None])[0]
+        }
+    
+    @timed_query('standings_at')
+    def get_standings_at(self, journee, saison='2025-2026', ligue='ligue1'):
+        """Classement à la journée N (dernier snapshot de chaque équipe jusqu'à N)"""
+        try:
+            pipeline = self._standings_pipeline(journee, saison, ligue)
+            standings = list(self.db.standings_history.aggregate(pipeline))
+            for position, team in enumerate(standings, start=1):
+                team['position'] = position
+            return standings
+        except Exception as e:
+            logger.error(f'Error fetching standings at journee {journee}: {e}')
+            return []
+    
+    @staticmethod
+    def _standings_pipeline(journee, saison, ligue):
+        return [
+            {'$match': {'ligue': ligue, 'saison': saison, 'journee': {'$lte': journee}}},
+            {'$sort': {'journee': -1}},
+            {'$group': {'_id': '$equipe', 'snapshot': {'$first': '$$ROOT'}}},
+            {'$replaceRoot': {'newRoot': '$snapshot'}},
+            {'$project': {'_id': 0}},
+            {'$sort': {'points': -1, 'difference': -1, 'buts_pour': -1}}
+        ]
+    
+    @timed_query('points_trajectory')
+    def get_points_trajectory(self, equipe, saison='2025-2026', ligue='ligue1'):
+        """Évolution des points et du classement d'une équipe journée par journée"""
+        try:
+            trajectory = list(self.db.standings_history.find(
+                {'equipe': equipe, 'ligue': ligue, 'saison': saison},
+                {'_id': 0, 'journee': 1, 'points': 1, 'position': 1, 'difference': 1}
+            ).sort('journee', 1))
+            return trajectory
+        except Exception as e:
+            logger.error(f'Error fetching trajectory for {equipe}: {e}')
+            return []
+    
+    def get_computed_standings(self, saison='2025-2026', ligue='ligue1', journee=None, date=None):
+        """Classement calculé depuis les résultats (<ligue>_matches) avec le départage LFP
+
+        Sans date, toutes les journées d'une saison sont calculées en une fois et mises en
+        cache : seul le classement demandé (dernière journée par défaut) est renvoyé.
+        Si des matchs n'ont pas de journée observée (journée inconnue ou estimée, ex: saisons
+        chargées en une fois), le dernier classement est calculé avec tous les matchs
+        (standings_at) et un classement à la journée N est refusé. ``date`` porte sur la
+        première observation des résultats par le spider (first_seen).
+        Une journée inférieure à 1 donne une liste vide.
+        """
+        if journee is not None and journee < 1:
+            logger.warning(f'Invalid journee {journee} for computed standings ({ligue} {saison})')
+            return []
+        try:
+            if date is not None:
+                matches = self._load_season_matches(saison, ligue)
+                return standings_at(matches, date=date, journee=journee).table(ligue=ligue, saison=saison)
+            
+            _, standings = self.cache.get(
+                ('computed_standings', ligue, saison),
+                lambda: standings_by_journee(self._load_season_matches(saison, ligue))
+            )
+            if not len(standings.teams):
+                return []
+            unknown = int((standings.matches.journee == 0).sum())
+            if unknown:
+                if journee is not None:
+                    logger.warning(f'{unknown} matches without observed journee, standings at journee {journee} '
+                                   f'not available ({ligue} {saison})')
+                    return []
+                return standings_at(standings.matches).table(ligue=ligue, saison=saison)
+            index = -1 if journee is None else min(journee, len(standings)) - 1
+            return standings.table(index, ligue=ligue, saison=saison)
+        except Exception as e:
+            logger.error(f'Error computing standings ({ligue} {saison}): {e}')
+            return []
+    
+    @timed_query('season_matches')
+    def _load_season_matches(self, saison, ligue):
+        """Résultats d'une saison sous forme de tableaux NumPy"""
+        cursor = self.db[f'{ligue}_matches'].find(
+            {'saison': saison},
+            {'_id': 0, 'equipe_domicile': 1, 'equipe_exterieur': 1, 'buts_domicile': 1,
+             'buts_exterieur': 1, 'journee': 1, 'journee_estimee': 1, 'first_seen': 1, 'date': 1}
+        )
+        return SeasonMatches.from_documents(cursor)
+    
+    def pool_stats(self):
+        """Statistiques du pool de connexions de ce processus (par serveur)"""
+        return pool_stats.snapshot()
+    
     def close(self):
         """Ferme la connexion"""
         if self.client: